@@ -0,0 +1,227 @@
+# WeatherApp/benchmark.py
+"""Upstream client benchmarks against a local open-meteo stub.
+
+    python -m WeatherApp.benchmark --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+import httpx
+
+from WeatherApp.weather_cache import WeatherCache
+from fastapi import HTTPException
+
+from WeatherApp.geocode_cache import GeocodeCache
+from WeatherApp.weather_client import ForecastClient
+
+
+# -------- local stub of the geocoding + forecast APIs --------
+
+class StubServer:
+    """Minimal HTTP/1.1 keep-alive server answering like open-meteo."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def delay(self, path: str) -> float:
+        return self.latency
+
+    def respond(self, path: str, query: str) -> tuple[int, dict]:
+        if path.endswith("/search"):
+            return 200, {"results": [{"latitude": 52.52, "longitude": 13.41}]}
+        current = {"current_weather": {"temperature": 12.3, "windspeed": 4.5, "weathercode": 3,
+                                       "time": datetime.utcnow().strftime("%Y-%m-%dT%H:%M")}}
+        latitudes = parse_qs(query).get("latitude", [""])[0].split(",")
+        return 200, current if len(latitudes) == 1 else [current] * len(latitudes)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                target = request_line.split()[1].decode()
+                path, _, query = target.partition("?")
+                delay = self.delay(path)
+                if delay:
+                    await asyncio.sleep(delay)
+                code, payload = self.respond(path, query)
+                body = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {code} OK\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # client went away (e.g. a cancelled hedge) or the stub is shutting down
+        finally:
+            writer.close()
+
+
+class FaultyStub(StubServer):
+    """Injects upstream faults: a share of slow responses and of 500s; `down` fails everything."""
+
+    def __init__(self, latency: float = 0.01, slow_rate: float = 0.02, slow_latency: float = 1.0,
+                 error_rate: float = 0.0, seed: int = 7):
+        super().__init__(latency)
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.down = False
+        self._random = random.Random(seed)
+
+    def delay(self, path: str) -> float:
+        if self.down:
+            return self.slow_latency
+        return self.slow_latency if self._random.random() < self.slow_rate else self.latency
+
+    def respond(self, path: str, query: str) -> tuple[int, dict]:
+        if self.down or self._random.random() < self.error_rate:
+            return 500, {"error": True}
+        return super().respond(path, query)
+
+
+def point_at(client: ForecastClient, stub: StubServer) -> ForecastClient:
+    client.GEO_URL = f"{stub.base_url}/v1/search"
+    client.WEATHER_URL = f"{stub.base_url}/v1/forecast"
+    return client
+
+
+class FreshClientPerCall(ForecastClient):
+    """The previous behaviour: a new AsyncClient (new TCP/TLS connection) per upstream call."""
+
+    async def _send(self, url: str, params: dict) -> httpx.Response:
+        async with httpx.AsyncClient() as client:
+            return await client.get(url, params=params, timeout=self.timeout)
+
+
+# -------- measurement --------
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+async def run(client: ForecastClient, requests: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with gate:
+            t0 = time.perf_counter()
+            await client.get_current_weather(f"city-{i % 50}")
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+async def bench_pooling(requests: int, concurrency: int) -> None:
+    stub = StubServer()
+    await stub.start()
+    try:
+        for label, client in (("fresh client per call", FreshClientPerCall()),
+                              ("pooled keep-alive", ForecastClient(http2=False))):
+            point_at(client, stub)
+            before = stub.connections
+            latencies = await run(client, requests, concurrency)
+            await client.aclose()
+            p50, p99 = percentiles(latencies)
+            print(f"{label:24s} p50={p50:7.2f}ms p99={p99:7.2f}ms "
+                  f"connections={stub.connections - before}")
+    finally:
+        await stub.stop()
+
+
+async def bench_coalescing(requests: int, concurrency: int) -> None:
+    """Same workload with and without the weather snapshot cache; counts upstream forecast calls."""
+    stub = StubServer(latency=0.05)
+    await stub.start()
+    try:
+        for label, cache in (("no weather cache", None), ("snapshot cache", WeatherCache())):
+            client = point_at(ForecastClient(http2=False, weather_cache=cache), stub)
+            before = stub.requests
+            latencies = await run(client, requests, concurrency)
+            await client.aclose()
+            p50, p99 = percentiles(latencies)
+            print(f"{label:24s} p50={p50:7.2f}ms p99={p99:7.2f}ms "
+                  f"upstream requests={stub.requests - before}")
+    finally:
+        await stub.stop()
+
+
+async def bench_resilience(requests: int, concurrency: int) -> None:
+    """Tail latency with 2% slow upstream answers, with and without hedging; then an outage."""
+    for label, hedge in (("no hedging", False), ("hedged at p95", True)):
+        stub = FaultyStub()
+        await stub.start()
+        client = point_at(ForecastClient(http2=False, hedge=hedge), stub)
+        try:
+            await run(client, 100, concurrency)  # fills the latency window the hedge delay comes from
+            latencies = await run(client, requests, concurrency)
+            p50, p99 = percentiles(latencies)
+            print(f"{label:24s} p50={p50:7.2f}ms p99={p99:7.2f}ms hedged={client.hedged}")
+        finally:
+            await client.aclose()
+            await stub.stop()
+
+    # outage: the breaker opens and cached cities keep getting their last known weather
+    stub = FaultyStub(slow_rate=0.0, slow_latency=0.5)
+    await stub.start()
+    client = point_at(ForecastClient(http2=False, geocode_cache=GeocodeCache(engine=None),
+                                      weather_cache=WeatherCache(ttl=0, min_ttl=0, stale_ttl=0)), stub)
+    try:
+        await client.get_current_weather("city-0")
+        stub.down = True
+        served, failed, before, start = 0, 0, stub.requests, time.perf_counter()
+        for _ in range(50):
+            try:
+                await client.get_current_weather("city-0")
+                served += 1
+            except HTTPException:
+                failed += 1
+        print(f"{'outage, breaker open':24s} {served} served last-known, {failed} failed "
+              f"in {time.perf_counter() - start:.2f}s, upstream requests={stub.requests - before}")
+    finally:
+        await client.aclose()
+        await stub.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WeatherApp upstream client benchmarks")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(bench_pooling(args.requests, args.concurrency))
+    asyncio.run(bench_coalescing(args.requests, args.concurrency))
+    asyncio.run(bench_resilience(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
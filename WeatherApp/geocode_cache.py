@@ -0,0 +1,160 @@
+# app/geocode_cache.py
+"""Two-tier geocode cache: in-process LRU in front of the geocode_cache table.
+
+Warm it up with every distinct task city:
+
+    python -m WeatherApp.geocode_cache
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlmodel import select
+
+from WeatherApp.database import engine as default_engine
+from WeatherApp.models import GeocodeEntry, Task
+
+Coordinates = tuple[float, float]
+
+# returned by get() when neither tier knows the city
+MISS = object()
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        engine: AsyncEngine | None = default_engine,
+        maxsize: int = 10_000,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 3600,
+    ) -> None:
+        self.engine = engine
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory: OrderedDict[str, tuple[float, Coordinates | None]] = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, city: str):
+        """Coordinates, None for a cached "City not found", or MISS."""
+        key = normalize_city(city)
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._memory[key]
+
+        row = await self._load(key)
+        if row is not None:
+            coords = (row.latitude, row.longitude) if row.found else None
+            age = (datetime.utcnow() - row.fetched_at).total_seconds()
+            ttl = self.ttl if row.found else self.negative_ttl
+            if age < ttl:
+                self._remember(key, coords, ttl - age)
+                self.db_hits += 1
+                return coords
+
+        self.misses += 1
+        return MISS
+
+    def peek(self, city: str):
+        """Like get() but in-memory only, and without touching counters or LRU order."""
+        entry = self._memory.get(normalize_city(city))
+        if entry is None or entry[0] <= time.monotonic():
+            return MISS
+        return entry[1]
+
+    async def put(self, city: str, coords: Coordinates | None) -> None:
+        key = normalize_city(city)
+        self._remember(key, coords, self.ttl if coords else self.negative_ttl)
+        await self._save(key, coords)
+
+    def _remember(self, key: str, coords: Coordinates | None, ttl: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl, coords)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    # -------- persistent tier (best effort: a DB problem must not fail the request) --------
+
+    async def _load(self, key: str) -> GeocodeEntry | None:
+        if self.engine is None:
+            return None
+        try:
+            async with AsyncSession(self.engine) as session:
+                return await session.get(GeocodeEntry, key)
+        except SQLAlchemyError as exc:
+            print(f"[geocode cache] load failed: {exc!r}")
+            return None
+
+    async def _save(self, key: str, coords: Coordinates | None) -> None:
+        if self.engine is None:
+            return
+        entry = GeocodeEntry(
+            city_key=key,
+            latitude=coords[0] if coords else None,
+            longitude=coords[1] if coords else None,
+            found=coords is not None,
+            fetched_at=datetime.utcnow(),
+        )
+        try:
+            async with AsyncSession(self.engine) as session:
+                await session.merge(entry)
+                await session.commit()
+        except SQLAlchemyError as exc:
+            print(f"[geocode cache] save failed: {exc!r}")
+
+    async def purge_expired(self) -> None:
+        """Drop negative entries older than negative_ttl so those cities are retried."""
+        if self.engine is None:
+            return
+        cutoff = datetime.utcnow() - timedelta(seconds=self.negative_ttl)
+        async with AsyncSession(self.engine) as session:
+            rows = await session.execute(
+                select(GeocodeEntry).where(GeocodeEntry.found == False, GeocodeEntry.fetched_at < cutoff)  # noqa: E712
+            )
+            for row in rows.scalars():
+                await session.delete(row)
+            await session.commit()
+
+
+async def warm_up(concurrency: int = 8) -> int:
+    """Geocode every distinct Task.city that is not cached yet; returns how many were fetched."""
+    from WeatherApp.weather_client import get_forecast_client
+
+    client = get_forecast_client()
+    cache = client.geocode_cache
+    async with AsyncSession(default_engine) as session:
+        cities = (await session.execute(select(Task.city).distinct())).scalars().all()
+
+    pending = {normalize_city(c): c for c in cities}
+    gate = asyncio.Semaphore(concurrency)
+    misses_before = cache.misses if cache else 0
+
+    async def resolve(city: str) -> None:
+        async with gate:
+            try:
+                await client.get_coordinates(city)
+            except Exception as exc:  # "City not found" is cached too; anything else is just reported
+                print(f"[geocode warm-up] {city}: {exc!r}")
+
+    try:
+        await asyncio.gather(*(resolve(c) for c in pending.values()))
+    finally:
+        await client.aclose()
+    return (cache.misses - misses_before) if cache else len(pending)
+
+
+if __name__ == "__main__":
+    print(f"warmed {asyncio.run(warm_up())} cities")
@@ -1,23 +1,48 @@
+import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from dotenv import load_dotenv
 
+# load env before the WeatherApp modules read their settings
+load_dotenv()
+
+from WeatherApp.database import engine, warm_pool
 from WeatherApp.models import create_tables
+from WeatherApp.prefetch import get_prefetch_scheduler
+from WeatherApp.routers.metrics import router as metrics_router
 from WeatherApp.routers.users import router as users_router
 from WeatherApp.routers.tasks import router as tasks_router
+from WeatherApp.weather_client import get_forecast_client
 
-load_dotenv()
 
-app = FastAPI(title="Weather Task API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # schema managed elsewhere (migrations)? set DB_CREATE_TABLES=false
+    if os.getenv("DB_CREATE_TABLES", "true").lower() in ("1", "true", "yes"):
+        await create_tables()
+    await warm_pool()
+    # one pooled, keep-alive upstream client for the whole app lifetime
+    forecast_client = get_forecast_client()
+    await forecast_client.start()
+    # keeps the hottest cities' weather fresh in the background
+    prefetch = get_prefetch_scheduler()
+    if os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes"):
+        prefetch.start()
+    try:
+        yield
+    finally:
+        await prefetch.stop()
+        await forecast_client.aclose()
+        await engine.dispose()
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    create_tables()
+app = FastAPI(title="Weather Task API", lifespan=lifespan)
 
 
 app.include_router(users_router)
 app.include_router(tasks_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
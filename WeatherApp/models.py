@@ -1,4 +1,5 @@
-from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from WeatherApp.database import engine
 import asyncio
@@ -8,17 +9,37 @@ class User(SQLModel, table=True):
 
     id: int | None = Field(default=None, primary_key=True)
     name: str = Field(max_length=50)
-    tasks: list['Task'] = Relationship(back_populates='user')
+    # lazy='raise': loading tasks must be explicit (selectinload), never an N+1 / async lazy load
+    tasks: list['Task'] = Relationship(back_populates='user', sa_relationship_kwargs={'lazy': 'raise'})
 
 class Task(SQLModel, table=True):
     __tablename__ = 'tasks'
+    # keyset pagination walks id inside each filter
+    __table_args__ = (
+        Index('ix_tasks_user_id_id', 'user_id', 'id'),
+        Index('ix_tasks_city_key_id', 'city_key', 'id'),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(max_length=255, index=True)
     content: str 
+    city: str = Field(max_length=255)
+    city_key: str = Field(max_length=255)  # normalize_city(city), kept in sync by the router
     user_id: int = Field(foreign_key='users.id', index=True)
-    user: User | None = Relationship(back_populates='tasks')
-    
+    user: User | None = Relationship(back_populates='tasks', sa_relationship_kwargs={'lazy': 'raise'})
+
+
+class GeocodeEntry(SQLModel, table=True):
+    """Persistent tier of the geocode cache; found=False rows are cached 'City not found'."""
+    __tablename__ = 'geocode_cache'
+
+    city_key: str = Field(primary_key=True, max_length=255)  # normalized city name
+    latitude: float | None = None
+    longitude: float | None = None
+    found: bool = True
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 async def create_tables() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
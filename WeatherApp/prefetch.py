@@ -0,0 +1,147 @@
+# app/prefetch.py
+"""Keeps the weather of the most-read cities warm.
+
+Routes call record() for every city whose weather they serve. Every `interval`
+seconds the scheduler takes the top_k cities by (decaying) popularity and
+re-fetches the ones whose snapshot expires within `lead` seconds, so readers of
+hot cities never wait for the upstream. Upstream calls are paced by a token
+bucket shared by all refreshes.
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Annotated
+
+from fastapi import Depends
+
+from WeatherApp.geocode_cache import MISS, normalize_city
+from WeatherApp.weather_cache import Location
+from WeatherApp.weather_client import ForecastClient, get_forecast_client
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PrefetchScheduler:
+    def __init__(
+        self,
+        client: ForecastClient,
+        top_k: int = 50,
+        interval: float = 30.0,
+        lead: float = 60.0,
+        jitter: float = 0.2,
+        rate: float = 2.0,
+        burst: int = 5,
+        decay: float = 0.8,
+    ) -> None:
+        self.client = client
+        self.top_k = top_k
+        self.interval = interval
+        self.lead = lead
+        self.jitter = jitter
+        self.decay = decay
+        self.budget = TokenBucket(rate, burst)
+        self._popularity: dict[str, float] = {}
+        self._names: dict[str, str] = {}
+        self._task: asyncio.Task | None = None
+        self.refreshed = 0
+
+    @classmethod
+    def from_env(cls, client: ForecastClient) -> "PrefetchScheduler":
+        return cls(
+            client,
+            top_k=int(os.getenv("PREFETCH_TOP_K", "50")),
+            interval=float(os.getenv("PREFETCH_INTERVAL", "30")),
+            lead=float(os.getenv("PREFETCH_LEAD", "60")),
+            rate=float(os.getenv("PREFETCH_RATE", "2")),
+            burst=int(os.getenv("PREFETCH_BURST", "5")),
+        )
+
+    def record(self, city: str, reads: int = 1) -> None:
+        key = normalize_city(city)
+        self._popularity[key] = self._popularity.get(key, 0.0) + reads
+        self._names.setdefault(key, city)
+
+    def top_cities(self) -> list[str]:
+        ranked = sorted(self._popularity, key=self._popularity.__getitem__, reverse=True)
+        return [self._names[key] for key in ranked[: self.top_k]]
+
+    def _age(self) -> None:
+        # old popularity fades so yesterday's hot cities stop being refreshed
+        for key in list(self._popularity):
+            self._popularity[key] *= self.decay
+            if self._popularity[key] < 0.01:
+                del self._popularity[key]
+                del self._names[key]
+
+    async def _due(self) -> list[Location]:
+        cache, geocode = self.client.weather_cache, self.client.geocode_cache
+        if cache is None or geocode is None:
+            return []
+        due = []
+        for city in self.top_cities():
+            # peek: the scan must not count as cache traffic in the stats
+            coords = geocode.peek(city)
+            if coords is MISS or coords is None:
+                continue  # geocoded by the next real read; prefetch spends budget on weather only
+            expires_in = cache.expires_in(*coords)
+            # jittered lead spreads refreshes of cities fetched at the same moment
+            lead = self.lead * random.uniform(1 - self.jitter, 1 + self.jitter)
+            if expires_in is None or expires_in < lead + self.interval:
+                due.append(coords)
+        return due
+
+    async def run_once(self) -> int:
+        due = await self._due()
+        step = self.client.MAX_LOCATIONS_PER_CALL
+        for i in range(0, len(due), step):
+            await self.budget.acquire()
+            await self.client.refresh_weather(due[i:i + step])
+        self._age()
+        self.refreshed += len(due)
+        return len(due)
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:  # keep the schedule alive; next run retries
+                print(f"[prefetch] failed: {exc!r}")
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    # ---------- lifecycle (driven by the app lifespan) ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+_prefetch_scheduler = PrefetchScheduler.from_env(get_forecast_client())
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    return _prefetch_scheduler
+
+
+PrefetchDep = Annotated[PrefetchScheduler, Depends(get_prefetch_scheduler)]
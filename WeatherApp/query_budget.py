@@ -0,0 +1,104 @@
+# app/query_budget.py
+"""Query-count check for the list endpoints (guards against N+1 regressions).
+
+Seeds a scratch SQLite database at two sizes and fails if any list endpoint
+issues more SQL statements for the bigger one, or more than its budget:
+
+    python -m WeatherApp.query_budget
+"""
+import asyncio
+import os
+import tempfile
+
+# must be set before WeatherApp.database builds the engine
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'query_budget.db')}"
+)
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+
+import httpx
+from sqlalchemy import event
+
+from WeatherApp.benchmark import StubServer, point_at
+from WeatherApp.database import engine
+from WeatherApp.main import app
+from WeatherApp.weather_client import get_forecast_client
+
+# path -> max statements per request, whatever the number of rows
+BUDGETS = {
+    "/users/": 1,
+    "/users/?include=tasks": 2,
+    "/tasks/": 1,
+    "/tasks/?with_weather=true": 1,  # geocodes come from the in-process cache once warm
+}
+
+
+class QueryCounter:
+    """Counts statements sent through `engine` while active."""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine.sync_engine
+        self.count = 0
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+async def seed(client: httpx.AsyncClient, users: int, tasks_per_user: int) -> None:
+    for u in range(users):
+        user = (await client.post("/users/", json={"name": f"user-{u}"})).json()
+        rows = [
+            {"title": f"task-{u}-{t}", "content": "x", "city": ("Berlin", "Paris", "Rome")[t % 3],
+             "user_id": user["id"]}
+            for t in range(tasks_per_user)
+        ]
+        await client.post("/tasks/bulk", json=rows)
+
+
+async def count_queries(client: httpx.AsyncClient) -> dict[str, int]:
+    counts = {}
+    for path in BUDGETS:
+        with QueryCounter(engine) as counter:
+            resp = await client.get(path)
+            resp.raise_for_status()
+        counts[path] = counter.count
+    return counts
+
+
+async def check() -> list[str]:
+    stub = StubServer()
+    await stub.start()
+    point_at(get_forecast_client(), stub)
+    failures = []
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await seed(client, users=2, tasks_per_user=3)
+                await count_queries(client)  # warm the geocode cache so both passes see the same state
+                small = await count_queries(client)
+                await seed(client, users=20, tasks_per_user=10)
+                large = await count_queries(client)
+    finally:
+        await stub.stop()
+
+    for path, budget in BUDGETS.items():
+        print(f"{path:32s} {small[path]:3d} -> {large[path]:3d} statements (budget {budget})")
+        if large[path] > budget or large[path] != small[path]:
+            failures.append(path)
+    return failures
+
+
+if __name__ == "__main__":
+    failed = asyncio.run(check())
+    if failed:
+        raise SystemExit(f"query budget exceeded: {', '.join(failed)}")
+    print("all list endpoints within budget")
@@ -0,0 +1,78 @@
+# app/resilience.py
+"""Circuit breaker and latency histogram used by ForecastClient for each upstream."""
+import bisect
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_timeout`
+    seconds lets one probe call through (half-open) and closes again if it succeeds."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def release(self) -> None:
+        """The call let through ended without an outcome (e.g. cancelled): let the next one probe."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class LatencyHistogram:
+    """Cumulative Prometheus-style buckets plus a rolling window for quantiles."""
+
+    BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, window: int = 500, min_samples: int = 20) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min_samples = min_samples
+        self._window: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self._window.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """q-quantile of the recent window; None until min_samples were observed."""
+        if len(self._window) < self.min_samples:
+            return None
+        samples = sorted(self._window)
+        return samples[int(q * (len(samples) - 1))]
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        out, running = [], 0
+        for le, n in zip([*map(str, self.BUCKETS), "+Inf"], self.counts):
+            running += n
+            out.append((le, running))
+        return out
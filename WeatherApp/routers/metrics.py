@@ -0,0 +1,34 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from WeatherApp.database import pool_stats
+from WeatherApp.weather_client import get_forecast_client
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format."""
+    lines = []
+    for name, value in pool_stats().items():
+        kind = "counter" if name in ("wait_count", "wait_seconds_total") else "gauge"
+        lines.append(f"# TYPE weatherapp_db_pool_{name} {kind}")
+        lines.append(f"weatherapp_db_pool_{name} {value}")
+
+    client = get_forecast_client()
+    lines.append("# TYPE weatherapp_upstream_latency_seconds histogram")
+    for endpoint, hist in client.histograms.items():
+        for le, count in hist.cumulative():
+            lines.append(f'weatherapp_upstream_latency_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {count}')
+        lines.append(f'weatherapp_upstream_latency_seconds_sum{{endpoint="{endpoint}"}} {hist.sum}')
+        lines.append(f'weatherapp_upstream_latency_seconds_count{{endpoint="{endpoint}"}} {hist.count}')
+    lines.append("# TYPE weatherapp_upstream_breaker_open gauge")
+    for host, breaker in client.breakers.items():
+        lines.append(f'weatherapp_upstream_breaker_open{{host="{host}"}} {int(breaker.state != "closed")}')
+    lines.append("# TYPE weatherapp_upstream_hedged_total counter")
+    lines.append(f"weatherapp_upstream_hedged_total {client.hedged}")
+    lines.append("# TYPE weatherapp_weather_served_stale_total counter")
+    lines.append(f"weatherapp_weather_served_stale_total {client.served_stale}")
+    return "\n".join(lines) + "\n"
@@ -1,16 +1,25 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func
+from fastapi import APIRouter, Body, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from WeatherApp.dependency import AsyncDBSession
+from WeatherApp.geocode_cache import normalize_city
 from WeatherApp.models import Task, User
-from WeatherApp.schemas import TaskCreate, TaskRead, TaskReadWithWeather, TaskUpdate
+from WeatherApp.prefetch import PrefetchDep
+from WeatherApp.schemas import (
+    TaskBulkError, TaskBulkResult, TaskCreate, TaskRead, TaskReadWithWeather, TaskUpdate
+)
 from WeatherApp.weather_client import ForecastDep
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+MAX_BULK_TASKS = 5000
+
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
 async def create_task(task_in: TaskCreate, db: AsyncDBSession):
@@ -22,29 +31,113 @@ async def create_task(task_in: TaskCreate, db: AsyncDBSession):
         title=task_in.title,
         content=task_in.content,
         city=task_in.city,
+        city_key=normalize_city(task_in.city),
         user_id=task_in.user_id,
     )
     db.add(task)
     await db.commit()
-    await db.refresh(task)
     return task
 
 
-@router.get("/", response_model=list[TaskRead])
+@router.post("/bulk", response_model=TaskBulkResult)
+async def create_tasks_bulk(
+    db: AsyncDBSession,
+    rows: list[dict[str, Any]] = Body(..., max_length=MAX_BULK_TASKS),
+):
+    """Create many tasks in one transaction; invalid rows are reported, not fatal.
+
+    Rows are validated one by one (so one bad row doesn't reject the batch), all
+    user_ids are checked with a single IN query, and the valid rows go in with one
+    multi-row INSERT ... RETURNING.
+    """
+    errors: list[TaskBulkError] = []
+    valid: list[tuple[int, TaskCreate]] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, TaskCreate.model_validate(row)))
+        except ValidationError as exc:
+            detail = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+            errors.append(TaskBulkError(index=index, detail=detail))
+
+    user_ids = {task_in.user_id for _, task_in in valid}
+    existing = set((await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars()) if user_ids else set()
+
+    values = []
+    for index, task_in in valid:
+        if task_in.user_id not in existing:
+            errors.append(TaskBulkError(index=index, detail="User not found"))
+            continue
+        values.append({
+            "title": task_in.title,
+            "content": task_in.content,
+            "city": task_in.city,
+            "city_key": normalize_city(task_in.city),
+            "user_id": task_in.user_id,
+        })
+
+    created = []
+    if values:
+        result = await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), values)
+        created = [TaskRead.model_validate(task) for task in result]
+        await db.commit()
+
+    errors.sort(key=lambda error: error.index)
+    return TaskBulkResult(created=created, errors=errors)
+
+
+@router.get("/", response_model=list[TaskReadWithWeather] | list[TaskRead])
 async def list_tasks(
     db: AsyncDBSession,
+    forecast_client: ForecastDep,
+    prefetch: PrefetchDep,
     user_id: Optional[int] = Query(None),
     city: Optional[str] = Query(None),
+    with_weather: bool = Query(False),
+    after_id: Optional[int] = Query(None, description="id of the last task on the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ):
     stmt = select(Task)
     if user_id is not None:
         stmt = stmt.where(Task.user_id == user_id)
     if city is not None:
-        stmt = stmt.where(func.lower(Task.city) == city.lower())
+        stmt = stmt.where(Task.city_key == normalize_city(city))
+    if after_id is not None:
+        stmt = stmt.where(Task.id > after_id)
+    stmt = stmt.order_by(Task.id).limit(limit)
+
+    if not with_weather:
+        return StreamingResponse(_stream_tasks(db, stmt), media_type="application/json")
 
     result = await db.execute(stmt)
     tasks = result.scalars().all()
-    return tasks
+    for task in tasks:
+        prefetch.record(task.city)
+
+    # one lookup per distinct city, not per task
+    weather = await forecast_client.get_weather_for_cities(task.city for task in tasks)
+    return [
+        TaskReadWithWeather(
+            id=task.id,
+            title=task.title,
+            content=task.content,
+            city=task.city,
+            user_id=task.user_id,
+            weather=weather[normalize_city(task.city)],
+        )
+        for task in tasks
+    ]
+
+
+async def _stream_tasks(db: AsyncSession, stmt) -> AsyncIterator[str]:
+    # the request's session: FastAPI closes yield dependencies only after the
+    # streamed body has been sent, so one connection serves the whole request
+    result = await db.stream_scalars(stmt.execution_options(yield_per=200))
+    yield "["
+    sep = ""
+    async for task in result:
+        yield sep + TaskRead.model_validate(task).model_dump_json()
+        sep = ","
+    yield "]"
 
 
 @router.get("/{task_id}", response_model=TaskReadWithWeather)
@@ -52,11 +145,13 @@ async def get_task(
     task_id: int,
     db: AsyncDBSession,
     forecast_client: ForecastDep,
+    prefetch: PrefetchDep,
 ):
     task = await db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    prefetch.record(task.city)
     weather = await forecast_client.get_current_weather(task.city)
 
     return TaskReadWithWeather(
@@ -78,10 +173,11 @@ async def update_task(task_id: int, task_in: TaskUpdate, db: AsyncDBSession):
     update_data = task_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(task, field, value)
+    if task_in.city is not None:
+        task.city_key = normalize_city(task.city)
 
     db.add(task)
     await db.commit()
-    await db.refresh(task)
     return task
 
 
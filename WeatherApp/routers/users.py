@@ -1,10 +1,13 @@
 # app/routers/users.py
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from WeatherApp.dependency import AsyncDBSession
 from WeatherApp.models import User
-from WeatherApp.schemas import UserCreate, UserRead
+from WeatherApp.schemas import UserCreate, UserRead, UserReadWithTasks
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,15 +17,23 @@ async def create_user(user_in: UserCreate, db: AsyncDBSession):
     user = User(name=user_in.name)
     db.add(user)
     await db.commit()
-    await db.refresh(user)
     return user
 
 
-@router.get("/", response_model=list[UserRead])
-async def list_users(db: AsyncDBSession):
-    stmt = select(User)
+@router.get("/", response_model=list[UserReadWithTasks] | list[UserRead])
+async def list_users(
+    db: AsyncDBSession,
+    include: Optional[Literal["tasks"]] = Query(None),
+):
+    stmt = select(User).order_by(User.id)
+    if include == "tasks":
+        # one extra SELECT ... WHERE user_id IN (...) for all users, not one per user
+        stmt = stmt.options(selectinload(User.tasks))
     result = await db.execute(stmt)
-    return result.scalars().all()
+    users = result.scalars().all()
+    if include == "tasks":
+        return [UserReadWithTasks.model_validate(user) for user in users]
+    return [UserRead.model_validate(user) for user in users]
 
 
 @router.get("/{user_id}", response_model=UserRead)
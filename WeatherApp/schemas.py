@@ -50,6 +50,20 @@ class TaskRead(BaseModel):
         from_attributes = True
 
 
+class TaskBulkError(BaseModel):
+    index: int  # position of the row in the request body
+    detail: str
+
+
+class TaskBulkResult(BaseModel):
+    created: list[TaskRead]
+    errors: list[TaskBulkError]
+
+
+class UserReadWithTasks(UserRead):
+    tasks: list[TaskRead]
+
+
 # -------- Weather Schemas --------
 
 class WeatherInfo(BaseModel):
@@ -60,4 +74,5 @@ class WeatherInfo(BaseModel):
 
 
 class TaskReadWithWeather(TaskRead):
-    weather: WeatherInfo
+    # required but nullable: None when the task's city cannot be geocoded
+    weather: WeatherInfo | None
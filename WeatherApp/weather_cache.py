@@ -0,0 +1,213 @@
+# app/weather_cache.py
+"""Short-TTL current-weather snapshots per (lat, lon).
+
+- fresh entries are served directly;
+- stale entries (past the TTL, within stale_ttl) are served immediately while
+  one background refresh runs (stale-while-revalidate);
+- concurrent misses for the same location share one upstream request (single flight).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable
+
+from WeatherApp.schemas import WeatherInfo
+
+Location = tuple[float, float]
+Fetch = Callable[[], Awaitable[WeatherInfo]]
+FetchMany = Callable[[list[Location]], Awaitable[list[WeatherInfo]]]
+
+
+@dataclass
+class Snapshot:
+    weather: WeatherInfo
+    fresh_until: float
+    stale_until: float
+
+
+def location_key(lat: float, lon: float) -> Location:
+    # ~11 m; the geocoder returns the same coordinates for the same city anyway
+    return round(lat, 4), round(lon, 4)
+
+
+class WeatherCache:
+    def __init__(
+        self,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        min_ttl: float = 60,
+        maxsize: int = 10_000,
+    ) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.min_ttl = min_ttl
+        self.maxsize = maxsize
+        self._snapshots: OrderedDict[Location, Snapshot] = OrderedDict()
+        self._inflight: dict[Location, asyncio.Task] = {}
+        self._refreshes: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, lat: float, lon: float, fetch: Fetch) -> WeatherInfo:
+        key = location_key(lat, lon)
+        now = time.time()
+        snap = self._snapshots.get(key)
+        if snap is not None:
+            if now < snap.fresh_until:
+                self._snapshots.move_to_end(key)
+                self.hits += 1
+                return snap.weather
+            if now < snap.stale_until:
+                self._snapshots.move_to_end(key)
+                self.stale_hits += 1
+                self._revalidate(key, fetch)
+                return snap.weather
+        self.misses += 1
+        # shield: one cancelled caller must not cancel the request the others wait on
+        return await asyncio.shield(self._single_flight(key, fetch))
+
+    async def get_many(self, locations: Iterable[Location], fetch_many: FetchMany) -> dict[Location, WeatherInfo]:
+        """Batch form of get(): every location that needs the upstream goes into one fetch_many call.
+
+        Keys are location_key(lat, lon). Locations already in flight are awaited
+        rather than fetched again; stale ones are returned as-is and refreshed in
+        the same background batch.
+        """
+        now = time.time()
+        found: dict[Location, WeatherInfo] = {}
+        waiting: dict[Location, asyncio.Task] = {}
+        missing: list[Location] = []
+        stale: list[Location] = []
+        for lat, lon in locations:
+            key = location_key(lat, lon)
+            if key in found or key in waiting or key in missing:
+                continue
+            snap = self._snapshots.get(key)
+            if snap is not None and now < snap.stale_until:
+                self._snapshots.move_to_end(key)
+                found[key] = snap.weather
+                if now < snap.fresh_until:
+                    self.hits += 1
+                    continue
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    stale.append(key)
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        if missing or stale:
+            tasks = self._start_batch(missing + stale, fetch_many)
+            for key in missing:
+                waiting[key] = tasks[key]
+            for key in stale:
+                self._refreshes.add(tasks[key])
+                tasks[key].add_done_callback(self._refresh_done)
+
+        if waiting:
+            results = await asyncio.gather(*(asyncio.shield(t) for t in waiting.values()))
+            found.update(zip(waiting, results))
+        return found
+
+    async def refresh_many(self, locations: Iterable[Location], fetch_many: FetchMany) -> None:
+        """Fetch the locations now, fresh or not (prefetch); ones already in flight are skipped."""
+        keys = list(dict.fromkeys(location_key(lat, lon) for lat, lon in locations))
+        keys = [key for key in keys if key not in self._inflight]
+        if keys:
+            tasks = self._start_batch(keys, fetch_many)
+            await asyncio.shield(asyncio.gather(*tasks.values()))
+
+    def expires_in(self, lat: float, lon: float) -> float | None:
+        """Seconds until the snapshot goes stale (negative once it has); None if not cached."""
+        snap = self._snapshots.get(location_key(lat, lon))
+        return None if snap is None else snap.fresh_until - time.time()
+
+    def peek(self, lat: float, lon: float) -> WeatherInfo | None:
+        """Last known weather for the location, however old (None once evicted)."""
+        snap = self._snapshots.get(location_key(lat, lon))
+        return snap.weather if snap else None
+
+    # ---------- internals ----------
+    def _single_flight(self, key: Location, fetch: Fetch) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.ensure_future(self._load(key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _revalidate(self, key: Location, fetch: Fetch) -> None:
+        if key in self._inflight:
+            return
+        task = self._single_flight(key, fetch)
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # keep serving the stale snapshot; the next request retries
+            print(f"[weather cache] refresh failed: {task.exception()!r}")
+
+    async def _load(self, key: Location, fetch: Fetch) -> WeatherInfo:
+        weather = await fetch()
+        now = time.time()
+        fresh_until = self._expiry(weather, now)
+        self._snapshots[key] = Snapshot(weather, fresh_until, fresh_until + self.stale_ttl)
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.maxsize:
+            self._snapshots.popitem(last=False)
+        return weather
+
+    def _start_batch(self, keys: list[Location], fetch_many: FetchMany) -> dict[Location, asyncio.Task]:
+        """One fetch_many call for all keys, registered per key as in flight."""
+        batch = asyncio.ensure_future(self._load_many(keys, fetch_many))
+        tasks = {}
+        for key in keys:
+            task = asyncio.ensure_future(self._pick(batch, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+            tasks[key] = task
+        return tasks
+
+    async def _load_many(self, keys: list[Location], fetch_many: FetchMany) -> dict[Location, WeatherInfo]:
+        weathers = await fetch_many(keys)
+        now = time.time()
+        for key, weather in zip(keys, weathers):
+            fresh_until = self._expiry(weather, now)
+            self._snapshots[key] = Snapshot(weather, fresh_until, fresh_until + self.stale_ttl)
+            self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.maxsize:
+            self._snapshots.popitem(last=False)
+        return dict(zip(keys, weathers))
+
+    @staticmethod
+    async def _pick(batch: asyncio.Task, key: Location) -> WeatherInfo:
+        return (await asyncio.shield(batch))[key]
+
+    def _expiry(self, weather: WeatherInfo, now: float) -> float:
+        """Expire `ttl` after the upstream observation time, not after our fetch.
+
+        open-meteo reports current_weather.time in GMT at the start of its update
+        interval, so a snapshot fetched late in the interval lives correspondingly
+        shorter; min_ttl keeps a lagging upstream from being polled in a loop.
+        """
+        try:
+            observed = datetime.fromisoformat(weather.time).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            observed = now
+        return max(now + self.min_ttl, min(now, observed) + self.ttl)
+
+    async def aclose(self) -> None:
+        for task in list(self._refreshes):
+            task.cancel()
+        await asyncio.gather(*self._refreshes, return_exceptions=True)
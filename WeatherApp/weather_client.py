@@ -1,15 +1,209 @@
 # app/weather_client.py
-from typing import Annotated
+import asyncio
+import importlib.util
+import os
+from typing import Annotated, Iterable
+from urllib.parse import urlsplit
 
 import httpx
 from fastapi import Depends, HTTPException, status
 
+from WeatherApp.geocode_cache import MISS, GeocodeCache, normalize_city
+from WeatherApp.resilience import CircuitBreaker, LatencyHistogram
 from WeatherApp.schemas import WeatherInfo
+from WeatherApp.weather_cache import Location, WeatherCache, location_key
 
 
 class ForecastClient:
     GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
     WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+    # locations per multi-location forecast call (keeps the URL short)
+    MAX_LOCATIONS_PER_CALL = 50
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 20,
+        http2: bool | None = None,
+        geocode_cache: GeocodeCache | None = None,
+        weather_cache: WeatherCache | None = None,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+    ) -> None:
+        # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+        self.http2 = importlib.util.find_spec("h2") is not None if http2 is None else http2
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host_limit = per_host_limit
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self.geocode_cache = geocode_cache
+        self.weather_cache = weather_cache
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.histograms = {"geocode": LatencyHistogram(), "forecast": LatencyHistogram()}
+        self.hedged = 0
+        self.served_stale = 0
+
+    @classmethod
+    def from_env(cls) -> "ForecastClient":
+        http2 = os.getenv("WEATHER_HTTP2")
+        return cls(
+            timeout=float(os.getenv("WEATHER_HTTP_TIMEOUT", "10")),
+            max_connections=int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("WEATHER_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("WEATHER_HTTP_KEEPALIVE_EXPIRY", "30")),
+            per_host_limit=int(os.getenv("WEATHER_HTTP_PER_HOST_LIMIT", "20")),
+            http2=None if http2 is None else http2.lower() in ("1", "true", "yes"),
+            geocode_cache=GeocodeCache(
+                ttl=float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600))),
+                negative_ttl=float(os.getenv("GEOCODE_CACHE_NEGATIVE_TTL", "3600")),
+            ),
+            weather_cache=WeatherCache(
+                ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+                stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+            ),
+            breaker_threshold=int(os.getenv("WEATHER_BREAKER_THRESHOLD", "5")),
+            breaker_reset=float(os.getenv("WEATHER_BREAKER_RESET", "30")),
+            hedge=os.getenv("WEATHER_HEDGE", "false").lower() in ("1", "true", "yes"),
+            hedge_quantile=float(os.getenv("WEATHER_HEDGE_QUANTILE", "0.95")),
+        )
+
+    # ---------- lifecycle (driven by the app lifespan) ----------
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(http2=self.http2, limits=self.limits, timeout=self.timeout)
+
+    async def aclose(self) -> None:
+        if self.weather_cache is not None:
+            await self.weather_cache.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, url: str, params: dict) -> httpx.Response:
+        """One upstream call behind the host's circuit breaker.
+
+        5xx, other 4xx and transport errors become 502; a 429 becomes 503 with the
+        upstream's Retry-After. 5xx, 429 and transport errors count as breaker failures.
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breakers.setdefault(host, CircuitBreaker(self.breaker_threshold, self.breaker_reset))
+        if not breaker.allow():
+            # fail fast instead of waiting for the timeout of a service that is down
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Weather service unavailable",
+            )
+        try:
+            resp = await self._get_hedged(url, params)
+        except httpx.HTTPError as exc:
+            breaker.record_failure()
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Weather service error",
+            ) from exc
+        except BaseException:
+            # cancelled (client gone, hedge loser, shutdown) or a bug: a half-open
+            # breaker must not wait forever for this probe's outcome
+            breaker.release()
+            raise
+        if resp.status_code >= 500:
+            breaker.record_failure()
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Weather service error",
+            )
+        if resp.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            # throttled: back off like for an outage rather than keep hammering it
+            breaker.record_failure()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Weather service rate limit reached",
+                headers={"Retry-After": resp.headers.get("Retry-After", str(int(self.breaker_reset)))},
+            )
+        breaker.record_success()  # the service answered; a 4xx is about our request
+        if resp.status_code >= 400:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Weather service rejected the request ({resp.status_code})",
+            )
+        return resp
+
+    async def _get_hedged(self, url: str, params: dict) -> httpx.Response:
+        """Send a second, identical request if the first is slower than the endpoint's p95."""
+        delay = self.histograms[self._endpoint(url)].quantile(self.hedge_quantile) if self.hedge else None
+        if delay is None:
+            return await self._attempt(url, params)
+
+        attempts = [asyncio.ensure_future(self._attempt(url, params))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                self.hedged += 1
+                attempts.append(asyncio.ensure_future(self._attempt(url, params)))
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None and attempt.result().status_code < 500:
+                        return attempt.result()
+                if not pending:
+                    return attempt.result()  # both failed: surface the last failure
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def _attempt(self, url: str, params: dict) -> httpx.Response:
+        start = asyncio.get_running_loop().time()
+        resp = await self._send(url, params)
+        self.histograms[self._endpoint(url)].observe(asyncio.get_running_loop().time() - start)
+        return resp
+
+    async def _send(self, url: str, params: dict) -> httpx.Response:
+        if self._client is None:
+            await self.start()  # used outside the app lifespan (scripts, tests)
+        host = urlsplit(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with slots:
+            return await self._client.get(url, params=params)
+
+    def _endpoint(self, url: str) -> str:
+        return "geocode" if url == self.GEO_URL else "forecast"
+
+    # ---------- upstream calls ----------
+    async def get_coordinates(self, city: str) -> tuple[float, float]:
+        """Geocode through the cache; "City not found" answers are cached as well."""
+        if self.geocode_cache is None:
+            return await self._get_coordinates(city)
+
+        cached = await self.geocode_cache.get(city)
+        if cached is MISS:
+            try:
+                cached = await self._get_coordinates(city)
+            except HTTPException as exc:
+                if exc.status_code != status.HTTP_404_NOT_FOUND:
+                    raise
+                cached = None
+            await self.geocode_cache.put(city, cached)
+        if cached is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="City not found",
+            )
+        return cached
 
     async def _get_coordinates(self, city: str) -> tuple[float, float]:
         params = {
@@ -18,9 +212,7 @@ class ForecastClient:
             "language": "en",
             "format": "json",
         }
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(self.GEO_URL, params=params, timeout=10.0)
-        resp.raise_for_status()
+        resp = await self._get(self.GEO_URL, params)
         data = resp.json()
 
         results = data.get("results")
@@ -34,34 +226,102 @@ class ForecastClient:
         return float(first["latitude"]), float(first["longitude"])
 
     async def get_current_weather(self, city: str) -> WeatherInfo:
-        lat, lon = await self._get_coordinates(city)
+        lat, lon = await self.get_coordinates(city)
+        if self.weather_cache is None:
+            return await self._get_weather(lat, lon)
+        try:
+            return await self.weather_cache.get(lat, lon, lambda: self._get_weather(lat, lon))
+        except HTTPException as exc:
+            # upstream down or breaker open: the last known weather beats an error
+            last = self.weather_cache.peek(lat, lon)
+            if exc.status_code < 500 or last is None:
+                raise
+            self.served_stale += 1
+            return last
 
+    async def get_weather_for_cities(
+        self, cities: Iterable[str], concurrency: int = 8
+    ) -> dict[str, WeatherInfo | None]:
+        """Weather for each distinct city, keyed by normalize_city(); None if the city is unknown.
+
+        Cities are geocoded with at most `concurrency` lookups in flight, then every
+        location not in the weather cache is fetched with multi-location forecast calls.
+        """
+        names = {normalize_city(c): c for c in cities}
+        gate = asyncio.Semaphore(concurrency)
+
+        async def locate(city: str) -> tuple[float, float] | None:
+            async with gate:
+                try:
+                    return await self.get_coordinates(city)
+                except HTTPException as exc:
+                    # unknown city, or geocoder unavailable: that city's tasks get no weather
+                    if exc.status_code != status.HTTP_404_NOT_FOUND and exc.status_code < 500:
+                        raise
+                    return None
+
+        coords = dict(zip(names, await asyncio.gather(*(locate(c) for c in names.values()))))
+        keys = list({location_key(*c) for c in coords.values() if c is not None})
+        if not keys:
+            weather = {}
+        elif self.weather_cache is None:
+            weather = dict(zip(keys, await self._get_weather_many(keys)))
+        else:
+            try:
+                weather = await self.weather_cache.get_many(keys, self._get_weather_many)
+            except HTTPException as exc:
+                if exc.status_code < 500:
+                    raise
+                weather = {key: self.weather_cache.peek(*key) for key in keys}
+                self.served_stale += sum(w is not None for w in weather.values())
+        return {name: weather[location_key(*c)] if c else None for name, c in coords.items()}
+
+    async def refresh_weather(self, locations: list[Location]) -> None:
+        """Re-fetch cached snapshots ahead of expiry (used by the prefetch scheduler)."""
+        if self.weather_cache is not None:
+            await self.weather_cache.refresh_many(locations, self._get_weather_many)
+
+    async def _get_weather(self, lat: float, lon: float) -> WeatherInfo:
+        [weather] = await self._get_weather_chunk([(lat, lon)])
+        return weather
+
+    async def _get_weather_many(self, locations: list[Location]) -> list[WeatherInfo]:
+        step = self.MAX_LOCATIONS_PER_CALL
+        chunks = await asyncio.gather(
+            *(self._get_weather_chunk(locations[i:i + step]) for i in range(0, len(locations), step))
+        )
+        return [weather for chunk in chunks for weather in chunk]
+
+    async def _get_weather_chunk(self, locations: list[Location]) -> list[WeatherInfo]:
+        # open-meteo takes comma-separated coordinates and then answers with a list
         params = {
-            "latitude": lat,
-            "longitude": lon,
+            "latitude": ",".join(str(lat) for lat, _ in locations),
+            "longitude": ",".join(str(lon) for _, lon in locations),
             "current_weather": "true",
         }
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(self.WEATHER_URL, params=params, timeout=10.0)
-        resp.raise_for_status()
+        resp = await self._get(self.WEATHER_URL, params)
         data = resp.json()
+        entries = data if isinstance(data, list) else [data]
 
-        cw = data.get("current_weather")
-        if not cw:
+        cws = [entry.get("current_weather") for entry in entries]
+        if len(cws) != len(locations) or not all(cws):
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail="Weather service error",
             )
 
-        return WeatherInfo(
-            temperature=cw["temperature"],
-            windspeed=cw["windspeed"],
-            weathercode=cw["weathercode"],
-            time=cw["time"],
-        )
+        return [
+            WeatherInfo(
+                temperature=cw["temperature"],
+                windspeed=cw["windspeed"],
+                weathercode=cw["weathercode"],
+                time=cw["time"],
+            )
+            for cw in cws
+        ]
 
 
-_forecast_client = ForecastClient()
+_forecast_client = ForecastClient.from_env()
 
 
 def get_forecast_client() -> ForecastClient:
@@ -1,31 +1,122 @@
-import httpx
+import asyncio
 import os
+import random
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException, status
+
 
 class AIClient():
-    
-    def __init__(self, api_key: str, base_url: str = 'https://api.openai.com/v1') -> None:
+    """Responses API client sharing one pooled httpx.AsyncClient.
+
+    At most `max_concurrency` calls are in flight; 429/5xx answers and transport
+    errors are retried `max_retries` times with jittered exponential backoff
+    (or the server's Retry-After), then surface as 502.
+    """
+
+    RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = 'https://api.openai.com/v1',
+        model: str = 'gpt-5-nano',
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+        backoff: float = 0.5,
+    ) -> None:
         self.api_key = api_key
         self.base_url = base_url
-        
-    async def summarize_content(self, content: str):
-        print('content', content)
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url=f"{self.base_url}/responses",
-                timeout=30,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-5-nano",
-                    "input": f"summarize the following content in 10 words: {content}",
-                    "store": True,
-                }
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.retries = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> 'AIClient':
+        return cls(
+            api_key=os.getenv('OPENAI_SECRECT_KEY') or '',
+            base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+            model=os.getenv('OPENAI_MODEL', 'gpt-5-nano'),
+            max_concurrency=int(os.getenv('AI_MAX_CONCURRENCY', '8')),
+            max_retries=int(os.getenv('AI_MAX_RETRIES', '3')),
+            timeout=float(os.getenv('AI_TIMEOUT', '30')),
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else None,
             )
-            
-            result = response.json()
-            print('result', result)
-            return result['output'][1]['content'][0]['text']
-        
-ai_client = AIClient(api_key=os.getenv('OPENAI_SECRECT_KEY') or '')
\ No newline at end of file
+        return self._client
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass  # HTTP-date form; fall back to our own backoff
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        detail = ''
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await self._get_client().post(path, json=payload)
+            except httpx.TransportError as exc:  # connect errors and timeouts
+                detail = f"summarizer unreachable: {exc!r}"
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                detail = f"summarizer returned {response.status_code}"
+                if response.status_code not in self.RETRY_STATUS:
+                    break
+                retry_after = response.headers.get('Retry-After')
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=detail)
+
+    @staticmethod
+    def _output_text(result: dict) -> str:
+        # output may start with reasoning items; the text is in the message item
+        for item in result.get('output', []):
+            if item.get('type') == 'message':
+                for part in item.get('content', []):
+                    if part.get('type') == 'output_text':
+                        return part['text']
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="summarizer response had no text"
+        )
+
+    async def summarize_content(self, content: str) -> str:
+        result = await self._post('/responses', {
+            "model": self.model,
+            "input": f"summarize the following content in 10 words: {content}",
+            "store": True,
+        })
+        return self._output_text(result)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+ai_client = AIClient.from_env()
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as carried in the access token (no DB row needed)."""
+    id: int
+    email: str
+    username: str
+    token_version: int
+
+
+class PrincipalCache:
+    """Verified tokens, keyed by their signature; an entry never outlives the token's exp."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()  # sync routes resolve the user in the threadpool
+
+    def get(self, signature: str) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[signature]
+                return None
+            self._entries.move_to_end(signature)
+            return entry[1]
+
+    def put(self, signature: str, principal: Principal, exp: float) -> None:
+        with self._lock:
+            self._entries[signature] = (exp, principal)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RevocationCache:
+    """Current (token_version, is_active) per user, re-read from the DB every `ttl` seconds.
+
+    Bumping users.token_version (or deactivating the user) invalidates all of the
+    user's tokens within `ttl` seconds on every worker.
+    """
+
+    def __init__(self, ttl: float = 5.0, maxsize: int = 10_000) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, tuple[float, int, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> tuple[int, bool] | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1], entry[2]
+
+    def put(self, user_id: int, token_version: int, is_active: bool) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, token_version, is_active)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
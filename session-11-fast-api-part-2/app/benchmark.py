@@ -0,0 +1,75 @@
+"""Login hashing benchmark: verify throughput vs pool size, and event-loop stalls.
+
+    python -m app.benchmark --logins 64
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from fastapi import HTTPException
+
+from app.hashing import HashingPool
+from app.security_utils import hash_password, verify_password
+
+
+async def probe_loop(stop: asyncio.Event) -> float:
+    """Worst delay of a 10ms timer while the logins run (what every other route would feel)."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run_logins(verify, logins: int) -> tuple[float, float]:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return logins / elapsed, await probe
+
+
+async def main(logins: int, kind: str) -> None:
+    stored = hash_password("secret123")
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, {logins} concurrent logins, argon2 {stored.split('$')[3]}")
+
+    async def inline():
+        verify_password("secret123", stored)  # what the sync handler body did, on the loop
+
+    rate, stall = await run_logins(inline, logins)
+    print(f"{'inline on event loop':24s} {rate:7.1f} logins/s  worst loop stall {stall * 1000:7.1f}ms")
+
+    for workers in sorted({1, 2, 4, cores, cores * 2}):
+        pool = HashingPool(workers=workers, queue_size=logins, kind=kind)
+        rate, stall = await run_logins(lambda: pool.verify_and_update("secret123", stored), logins)
+        pool.shutdown()
+        print(f"{f'{kind} pool, {workers} workers':24s} {rate:7.1f} logins/s  worst loop stall {stall * 1000:7.1f}ms")
+
+    # load shedding: a small backlog turns the excess into immediate 503s
+    pool = HashingPool(workers=cores, queue_size=cores, kind=kind)
+
+    async def shed():
+        try:
+            await pool.verify_and_update("secret123", stored)
+        except HTTPException:
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(shed() for _ in range(logins)))
+    pool.shutdown()
+    print(f"{'bounded backlog':24s} {logins - pool.rejected} served, {pool.rejected} shed with 503 "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="password hashing pool benchmark")
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.executor))
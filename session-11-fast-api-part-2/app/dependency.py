@@ -1,11 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session
+from sqlmodel import Session, select
 from app.database import get_session
 from app.database_async import get_async_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+import os
 from app.security_utils import decode_access_token
+from app.auth_cache import Principal, PrincipalCache, RevocationCache
 from app.models import User
 
 
@@ -14,37 +16,70 @@ AsyncDBSession = Annotated[AsyncSession, Depends(get_async_session)]
 
 password_oauth_scheme = OAuth2PasswordBearer(tokenUrl='/auth/login')
 
-def get_current_user(db: DBSession, token: str = Depends(password_oauth_scheme)):
-    user_id = decode_access_token(token)
-    print('user_id', user_id)
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED
-        )
-    
-    user = db.get(User, user_id)
-    if not user:
+principal_cache = PrincipalCache()
+revocations = RevocationCache(ttl=float(os.getenv('REVOCATION_CHECK_SECONDS', '5')))
+
+
+def resolve_principal(token: str) -> Principal:
+    """Verified principal from the token alone: cached by signature, else decoded"""
+    signature = token.rsplit('.', 1)[-1]
+    principal = principal_cache.get(signature)
+    if principal:
+        return principal
+
+    claims = decode_access_token(token)
+    if not claims or 'ver' not in claims:  # tokens issued before the user snapshot claims
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED
         )
+    principal = Principal(
+        id=int(claims['user_id']),
+        email=claims['email'],
+        username=claims['username'],
+        token_version=claims['ver'],
+    )
+    principal_cache.put(signature, principal, claims['exp'])
+    return principal
 
-    return user
 
-async def get_current_user_async(db: AsyncDBSession, token: str = Depends(password_oauth_scheme)):
-    user_id = decode_access_token(token)
-    print('user_id', user_id)
-    if not user_id:
+def check_revocation(principal: Principal, state: tuple[int, bool] | None):
+    if not state:  # user deleted
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED
         )
-    
-    user = await db.get(User, user_id)
-    if not user:
+    token_version, is_active = state
+    if not is_active or token_version != principal.token_version:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED
         )
 
-    return user
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
\ No newline at end of file
+def get_current_user(db: DBSession, token: str = Depends(password_oauth_scheme)):
+    principal = resolve_principal(token)
+
+    state = revocations.get(principal.id)
+    if state is None:
+        # one indexed PK lookup per user every few seconds, not per request
+        row = db.exec(select(User.token_version, User.is_active).where(User.id == principal.id)).first()
+        if row:
+            revocations.put(principal.id, *row)
+        state = tuple(row) if row else None
+    check_revocation(principal, state)
+
+    return principal
+
+async def get_current_user_async(db: AsyncDBSession, token: str = Depends(password_oauth_scheme)):
+    principal = resolve_principal(token)
+
+    state = revocations.get(principal.id)
+    if state is None:
+        row = (await db.execute(select(User.token_version, User.is_active).where(User.id == principal.id))).first()
+        if row:
+            revocations.put(principal.id, *row)
+        state = tuple(row) if row else None
+    check_revocation(principal, state)
+
+    return principal
+
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[Principal, Depends(get_current_user_async)]
@@ -0,0 +1,172 @@
+"""Local fake of the Responses API, and a check of the summary pipeline against it.
+
+Runs the pooled AIClient, the summary cache and the batch summarizer against
+the fake server and a scratch SQLite database (needs aiosqlite):
+
+    python -m app.fake_responses
+"""
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.ai_client import AIClient
+from app.models import Note, NoteSummary, User
+from app.summaries import BatchSummarizer, get_summary
+
+
+class FakeResponsesServer:
+    """Minimal HTTP/1.1 keep-alive server answering POST /v1/responses like the real API.
+
+    The first `fail_first` requests get `fail_status` (with Retry-After: 0).
+    """
+
+    def __init__(self, latency: float = 0.01, fail_first: int = 0, fail_status: int = 503) -> None:
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]  # type: ignore
+        return f"http://{host}:{port}/v1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self._server.close()  # type: ignore
+        await self._server.wait_closed()  # type: ignore
+
+    def respond(self, payload: dict) -> tuple[int, dict]:
+        if self.requests <= self.fail_first:
+            return self.fail_status, {"error": {"message": "overloaded"}}
+        words = payload["input"].split(": ", 1)[-1].split()
+        return 200, {
+            "output": [
+                {"type": "reasoning", "summary": []},
+                {"type": "message", "content": [
+                    {"type": "output_text", "text": "summary: " + " ".join(words[:10])},
+                ]},
+            ],
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                payload = json.loads(await reader.readexactly(length))
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    await asyncio.sleep(self.latency)
+                    code, body = self.respond(payload)
+                finally:
+                    self.in_flight -= 1
+                data = json.dumps(body).encode()
+                writer.write(
+                    f"HTTP/1.1 {code} OK\r\nContent-Type: application/json\r\nRetry-After: 0\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def expect(failures: list[str], ok: bool, message: str) -> None:
+    print(f"{'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+async def check() -> list[str]:
+    failures: list[str] = []
+    server = FakeResponsesServer(fail_first=2)
+    await server.start()
+    client = AIClient(api_key="test", base_url=server.base_url, max_concurrency=8, backoff=0.01)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'summaries.db')}")
+    try:
+        # retries: the first two answers are 503
+        text = await client.summarize_content("alpha beta gamma")
+        expect(failures, text == "summary: alpha beta gamma" and client.retries == 2,
+               f"503s retried ({client.retries} retries) then answered")
+
+        # pooling: many calls, few connections
+        server.connections = 0
+        await asyncio.gather(*(client.summarize_content(f"note {i}") for i in range(40)))
+        expect(failures, server.connections <= client.max_concurrency,
+               f"40 calls over {server.connections} pooled connections")
+
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            user = User(email="fake@example.com", username="fake", hash_password="x")
+            db.add(user)
+            await db.flush()
+            db.add_all([Note(title=f"n{i}", content=f"content of note {i}", user_id=user.id) for i in range(30)])  # type: ignore
+            await db.commit()
+
+        # batch: every pending note, bounded concurrency, then nothing left
+        server.max_in_flight = 0
+        summarizer = BatchSummarizer(client=client, engine=engine, batch_size=100, concurrency=4)
+        done = await summarizer.run_once()
+        expect(failures, done == 30 and server.max_in_flight <= 4,
+               f"batch summarized {done} notes, at most {server.max_in_flight} calls in flight")
+        expect(failures, await summarizer.run_once() == 0, "second batch run finds nothing pending")
+
+        # a title-only edit bumps updated_at but must not call the model again
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            note = (await db.execute(select(Note).where(Note.title == "n1"))).scalars().one()
+            note.title = "n1 renamed"
+            note.updated_at = datetime.now()
+            await db.commit()
+        before = server.requests
+        done = await summarizer.run_once()
+        expect(failures, done == 0 and server.requests == before and await summarizer.run_once() == 0,
+               "title-only edit re-stamped without a model call")
+
+        # cache: hit while unchanged, miss after the content changes
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            note = (await db.execute(select(Note).where(Note.title == "n0"))).scalars().one()
+            before = server.requests
+            summary, cached = await get_summary(db, note, client)
+            expect(failures, cached and server.requests == before, f"unchanged note served from cache: {summary!r}")
+            note.content = "completely new words"
+            await db.commit()
+            summary, cached = await get_summary(db, note, client)
+            expect(failures, not cached and summary == "summary: completely new words",
+                   "changed content re-summarized")
+            stored = await db.get(NoteSummary, note.id)
+            expect(failures, stored is not None and stored.summary == summary, "new summary stored")
+    finally:
+        await client.aclose()
+        await engine.dispose()
+        await server.stop()
+    return failures
+
+
+if __name__ == "__main__":
+    failed = asyncio.run(check())
+    if failed:
+        raise SystemExit(f"{len(failed)} summary checks failed")
+    print("summary pipeline ok")
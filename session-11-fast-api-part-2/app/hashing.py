@@ -0,0 +1,77 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.security_utils import hash_password, verify_and_update_password
+
+
+class HashingPool:
+    """Runs password hashing off the event loop, with a bounded backlog.
+
+    Argon2 (argon2-cffi) releases the GIL while hashing, so a thread pool already
+    uses every core; PASSWORD_HASH_EXECUTOR=process switches to worker processes.
+    When `workers + queue_size` hashes are in flight, new ones are rejected with
+    503 right away instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None, kind: str = 'thread') -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 4 if queue_size is None else queue_size
+        self.kind = kind
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> 'HashingPool':
+        workers = os.getenv('PASSWORD_HASH_WORKERS')
+        queue_size = os.getenv('PASSWORD_HASH_QUEUE')
+        return cls(
+            workers=int(workers) if workers else None,
+            queue_size=int(queue_size) if queue_size else None,
+            kind=os.getenv('PASSWORD_HASH_EXECUTOR', 'thread'),
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="too many logins in progress, retry shortly",
+                headers={'Retry-After': '1'},
+            )
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        self.in_flight += 1
+        # released when the hash itself finishes: a cancelled request stops waiting,
+        # but its hash keeps a worker busy until then
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool.from_env()
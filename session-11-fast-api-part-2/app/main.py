@@ -1,15 +1,32 @@
+from contextlib import asynccontextmanager
+import os
 from fastapi import FastAPI, Header, Query, Path, Body
 from typing import Optional
+from dotenv import load_dotenv
+
+# load env variables (before the app modules read JWT_SECRET_KEY etc.)
+load_dotenv()
+
 from app.schemas import Notebase
 from app.routers.notes import router as notes_router
 from app.routers.auth import router as auth_router
-from dotenv import load_dotenv
+from app.hashing import hashing_pool
+from app.ai_client import ai_client
+from app.summaries import batch_summarizer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.getenv('SUMMARIZER_ENABLED', 'false').lower() in ('1', 'true', 'yes'):
+        batch_summarizer.start()
+    yield
+    await batch_summarizer.stop()
+    await ai_client.aclose()
+    hashing_pool.shutdown()
 
-# load env variables
-load_dotenv()
 
 app = FastAPI(
-    title="fast api project"
+    title="fast api project",
+    lifespan=lifespan
 )
 
 app.include_router(notes_router)
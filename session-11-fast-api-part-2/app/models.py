@@ -7,6 +7,7 @@
 # Tag
 #id, value
 from sqlmodel import SQLModel, Field, Relationship, Session
+from sqlalchemy import Index, func, text
 from datetime import datetime
 from app.database import engine
 
@@ -18,24 +19,72 @@ class User(SQLModel, table=True):
     username: str = Field(max_length=50)
     hash_password: str = Field(max_length=255)
     created_at: datetime = Field(default=datetime.now())
+    is_active: bool = Field(default=True)
+    # bump to revoke every token issued so far (logout everywhere, deactivation)
+    token_version: int = Field(default=0)
     
     notes: list['Note'] = Relationship(back_populates='user')
     
 class Note(SQLModel, table=True):
     
     __tablename__ = 'notes' #type: ignore
+    # list_notes walks (updated_at desc, id) per user with a keyset cursor
+    __table_args__ = (
+        Index('ix_notes_user_id_updated_at_id', 'user_id', text('updated_at DESC'), 'id'),
+    )
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(max_length=50)
     content: str
     user_id: int = Field(foreign_key='users.id', index=True)
-    created_at: datetime = Field(default=datetime.now())
-    updated_at: datetime = Field(default=datetime.now())
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
 
     user: User = Relationship(back_populates='notes')
+
+
+# Postgres full-text index; the search query must use the same expression (app/search.py).
+# SQLite gets an FTS5 table instead (see ensure_search_index).
+Index(
+    'ix_notes_search',
+    func.to_tsvector('english', Note.title + ' ' + Note.content),  # type: ignore
+    postgresql_using='gin',
+).ddl_if(dialect='postgresql')
+
+
+class Tag(SQLModel, table=True):
+    __tablename__ = 'tags' #type: ignore
+    # tags are per user; (user_id, value) also serves the tag filter of /notes/search
+    __table_args__ = (Index('ix_tags_user_id_value', 'user_id', 'value', unique=True),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key='users.id')
+    value: str = Field(max_length=50)
+
+
+class NoteTag(SQLModel, table=True):
+    __tablename__ = 'note_tags' #type: ignore
+    __table_args__ = (Index('ix_note_tags_tag_id_note_id', 'tag_id', 'note_id'),)
+
+    note_id: int = Field(foreign_key='notes.id', primary_key=True, ondelete='CASCADE')
+    tag_id: int = Field(foreign_key='tags.id', primary_key=True, ondelete='CASCADE')
+
+
+class NoteSummary(SQLModel, table=True):
+    __tablename__ = 'note_summaries' #type: ignore
+
+    # valid while content_hash matches the note's content (app/summaries.py)
+    note_id: int = Field(foreign_key='notes.id', primary_key=True, ondelete='CASCADE')
+    content_hash: str = Field(max_length=64)
+    summary: str
+    model: str = Field(max_length=50)
+    created_at: datetime = Field(default_factory=datetime.now)
     
 
 def create_tables():
+    from app.search import ensure_search_index
+
     SQLModel.metadata.create_all(engine)
+    ensure_search_index(engine)
     
 if __name__ == '__main__':
     # create_tables()
@@ -5,16 +5,20 @@ from app.schemas import UserCreate, UserResponse, Token
 from app.models import Note, User
 from app.database import get_session
 from datetime import datetime
-from app.security_utils import hash_password, verify_password, create_access_token
+from app.security_utils import create_access_token
+from app.hashing import hashing_pool
 
-from app.dependency import DBSession
+from app.dependency import DBSession, AsyncDBSession, CurrentUser, revocations
 
 router = APIRouter(prefix='/auth')
 
+# async routes: hashing runs in the hashing pool, so it no longer occupies a
+# threadpool worker (or the event loop) for the ~50-100ms each Argon2 call takes
+
 @router.post('/register', response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: DBSession):
+async def register(user: UserCreate, db: AsyncDBSession):
     stmt = select(User).where(User.email == user.email)
-    existing_user = db.exec(stmt).first()
+    existing_user = (await db.execute(stmt)).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,27 +28,26 @@ def register(user: UserCreate, db: DBSession):
     db_user = User(
         email=user.email,
         username=user.username,
-        hash_password=hash_password(user.password)
+        hash_password=await hashing_pool.hash(user.password)
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post('/login', status_code=status.HTTP_200_OK, response_model=Token)
-def login(db: DBSession, form_data: OAuth2PasswordRequestForm = Depends() ):
-    print(form_data.username)
-    print(form_data.password)
-    user = db.exec(select(User).where(User.username == form_data.username)).first()
+async def login(db: AsyncDBSession, form_data: OAuth2PasswordRequestForm = Depends() ):
+    user = (await db.execute(select(User).where(User.username == form_data.username))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="user not found"
         )
     
-    if not verify_password(form_data.password, user.hash_password):
+    verified, new_hash = await hashing_pool.verify_and_update(form_data.password, user.hash_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="incorrect password"
@@ -56,7 +59,32 @@ def login(db: DBSession, form_data: OAuth2PasswordRequestForm = Depends() ):
             detail="user not found"
         )
     
-    access_token = create_access_token(user.id)
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="user is deactivated"
+        )
+    
+    access_token = create_access_token(user)
+    
+    if new_hash:
+        # hash parameters changed since this password was stored: upgrade it now
+        # (after create_access_token: the commit expires the loaded user)
+        user.hash_password = new_hash
+        db.add(user)
+        await db.commit()
     
     return {'access_token': access_token}
+
+@router.post('/logout-all', status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(db: DBSession, current_user: CurrentUser):
+    """Revoke every token issued to the current user"""
+    user = db.get(User, current_user.id)
+    if user:
+        user.token_version += 1
+        db.add(user)
+        db.commit()
+    # this worker sees it at once; the others within REVOCATION_CHECK_SECONDS
+    revocations.invalidate(current_user.id)
+    return None
     
\ No newline at end of file
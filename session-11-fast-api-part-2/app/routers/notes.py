@@ -1,10 +1,14 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Header, Response
+from sqlalchemy import and_, or_
 from sqlmodel import Session, select
-from app.schemas import NoteCreate, NoteResponse, NoteUpdate
+from typing import Optional
+import hashlib
+from app.schemas import NoteCreate, NoteResponse, NoteUpdate, NoteSearchHit, NoteSearchResult, TagValue
 from app.models import Note
 from app.database import get_session
 from datetime import datetime
-from app.ai_client import ai_client
+from app.summaries import get_summary, invalidate_summary
+from app.search import decode_cursor, encode_cursor, normalize_tags, search_notes_stmt, set_note_tags
  
 from app.dependency import DBSession, CurrentUser, AsyncDBSession, AsyncCurrentUser
 
@@ -31,6 +35,9 @@ def create_note(
     )
     
     db.add(db_note)
+    if note.tags:
+        db.flush()
+        set_note_tags(db, db_note, note.tags)
     db.commit()
     return db_note
 
@@ -42,13 +49,100 @@ def create_note(
 #     notes = db.exec(statement).all()
 #     return notes
 
+def _page_etag(notes: list[Note], next_cursor: str | None) -> str:
+    # a page changes only if a note on it is edited (updated_at), added or deleted
+    digest = hashlib.sha1(repr(next_cursor).encode())
+    for note in notes:
+        digest.update(f"{note.id}:{note.updated_at.isoformat()};".encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
 @router.get("/", response_model=list[NoteResponse])
-async def list_notes(db: AsyncDBSession, current_user: AsyncCurrentUser, limit: int = 10, offset: int = 0):
-    """List all notes"""
-    statement = select(Note).where(Note.user_id == current_user.id).offset(offset).limit(limit)
-    notes = (await db.execute(statement)).scalars().all()
+async def list_notes(
+    db: AsyncDBSession,
+    current_user: AsyncCurrentUser,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """List notes, most recently updated first.
+
+    Keyset-paginated on (updated_at desc, id): the next page's cursor comes back in the
+    X-Next-Cursor header (absent on the last page). Pages carry an ETag; sending it back
+    as If-None-Match gets a bodiless 304 while the page is unchanged.
+    """
+    statement = select(Note).where(Note.user_id == current_user.id)
+    if cursor:
+        try:
+            after_updated_at, after_id = decode_cursor(cursor)
+            after_updated_at, after_id = datetime.fromisoformat(after_updated_at), int(after_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="invalid cursor"
+            )
+        statement = statement.where(or_(
+            Note.updated_at < after_updated_at,
+            and_(Note.updated_at == after_updated_at, Note.id > after_id),  # type: ignore
+        ))
+    # same order as ix_notes_user_id_updated_at_id
+    statement = statement.order_by(Note.updated_at.desc(), Note.id).limit(limit + 1)  # type: ignore
+    notes = list((await db.execute(statement)).scalars().all())
+
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = encode_cursor([notes[-1].updated_at.isoformat(), notes[-1].id])
+
+    headers = {'ETag': _page_etag(notes, next_cursor), 'Cache-Control': 'private, no-cache'}
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    if _etag_matches(if_none_match, headers['ETag']):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
     return notes
 
+# declared before /{note_id}, which would otherwise capture "search"
+@router.get("/search", response_model=NoteSearchResult)
+async def search_notes(
+    db: AsyncDBSession,
+    current_user: AsyncCurrentUser,
+    q: str = Query('', max_length=200, description="words to find in title/content"),
+    tags: list[TagValue] = Query([], description="notes must have all of these tags"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Ranked full-text / tag search over the current user's notes"""
+    q = q.strip()
+    tags = normalize_tags(tags)
+    if not q and not tags:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="q or tags is required"
+        )
+    after = None
+    if cursor:
+        try:
+            after_rank, after_id = decode_cursor(cursor)
+            after = (float(after_rank), int(after_id))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="invalid cursor"
+            )
+
+    stmt = search_notes_stmt(db.bind.dialect.name, current_user.id, q, tags, after, limit + 1)
+    rows = (await db.execute(stmt)).all()
+    items = [NoteSearchHit(**note.model_dump(), rank=rank) for note, rank in rows[:limit]]
+    next_cursor = encode_cursor([items[-1].rank, items[-1].id]) if len(rows) > limit else None
+    return NoteSearchResult(items=items, next_cursor=next_cursor)
+
 @router.get("/{note_id}", response_model=NoteResponse)
 def get_note(note_id: int, db: DBSession):
     """Get a specific note"""
@@ -61,16 +155,17 @@ def get_note(note_id: int, db: DBSession):
     return note
 
 @router.get('/summarize/{note_id}')
-async def summarize_note(note_id: int, db: DBSession):
-    note = db.get(Note, note_id)
+async def summarize_note(note_id: int, db: AsyncDBSession):
+    note = await db.get(Note, note_id)
     if not note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Note with id {note_id} not found"
         )
 
-    result = await ai_client.summarize_content(note.content)
-    return {'content': result}
+    # the model is only called when the content changed since the last summary
+    summary, cached = await get_summary(db, note)
+    return {'content': summary, 'cached': cached}
 
 @router.patch("/{note_id}", response_model=NoteResponse)
 def update_note(note_id: int, note_update: NoteUpdate, db: DBSession):
@@ -84,6 +179,11 @@ def update_note(note_id: int, note_update: NoteUpdate, db: DBSession):
     
     # Update fields
     update_data = note_update.model_dump(exclude_unset=True)
+    tags = update_data.pop('tags', None)
+    if tags is not None:
+        set_note_tags(db, db_note, tags)
+    if 'content' in update_data and update_data['content'] != db_note.content:
+        invalidate_summary(db, note_id)
     
     # Update fields
     for key, value in update_data.items():
@@ -1,5 +1,9 @@
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from datetime import datetime
+from typing import Annotated
+
+# a tag's stored value is at most 50 characters (Tag.value)
+TagValue = Annotated[str, Field(max_length=50)]
 
 #Note entity
 class Notebase(BaseModel):
@@ -7,11 +11,12 @@ class Notebase(BaseModel):
     content: str = Field(..., min_length=1)
     
 class NoteCreate(Notebase):
-    pass
+    tags: list[TagValue] = Field(default_factory=list, max_length=20)
 
 class NoteUpdate(Notebase):
     title: str | None
     content: str | None
+    tags: list[TagValue] | None = Field(None, max_length=20)  # replaces all tags when given
     pass
 
 class NoteResponse(Notebase):
@@ -23,6 +28,13 @@ class NoteResponse(Notebase):
     class config: #adapte to Pydantic
         from_attribute = True
         
+class NoteSearchHit(NoteResponse):
+    rank: float
+
+class NoteSearchResult(BaseModel):
+    items: list[NoteSearchHit]
+    next_cursor: str | None  # pass back as ?cursor= for the next page
+        
 class UserBase(BaseModel):
     email: EmailStr = Field(..., max_length=255)
     username: str = Field(..., min_length=3, max_length=50)
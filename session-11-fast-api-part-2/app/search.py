@@ -0,0 +1,152 @@
+import base64
+import json
+from typing import Optional
+
+from sqlalchemy import Engine, and_, column, delete, func, literal, literal_column, or_, table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from app.models import Note, NoteTag, Tag
+
+SEARCH_CONFIG = 'english'
+
+# SQLite fallback: external-content FTS5 table kept in sync with notes by triggers
+notes_fts = table('notes_fts', column('rowid'))
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, content='notes', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+
+def ensure_search_index(engine: Engine):
+    """Create the SQLite FTS5 table (Postgres' GIN index is created with the tables)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conn:
+        existed = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'notes_fts'").first()
+        for ddl in SQLITE_FTS_DDL:
+            conn.exec_driver_sql(ddl)
+        if not existed:
+            conn.exec_driver_sql("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+# -------- tags --------
+
+def normalize_tags(tags: list[str]) -> list[str]:
+    return list(dict.fromkeys(t.strip().lower() for t in tags if t.strip()))
+
+
+def set_note_tags(db: Session, note: Note, tags: list[str]):
+    """Replace the note's tags, creating the user's missing Tag rows (caller commits)
+
+    Missing tags are inserted with ON CONFLICT DO NOTHING and then read back, so two
+    requests creating the same new tag at once both end up with the one row.
+    """
+    values = normalize_tags(tags)
+    tag_ids: dict[str, int] = {}
+    if values:
+        insert = pg_insert if db.bind.dialect.name == 'postgresql' else sqlite_insert  # type: ignore
+        db.exec(  # type: ignore
+            insert(Tag)
+            .values([{'user_id': note.user_id, 'value': value} for value in values])
+            .on_conflict_do_nothing(index_elements=['user_id', 'value'])
+        )
+        tag_ids = dict(db.exec(
+            select(Tag.value, Tag.id).where(Tag.user_id == note.user_id, Tag.value.in_(values))  # type: ignore
+        ).all())
+    db.exec(delete(NoteTag).where(NoteTag.note_id == note.id))  # type: ignore
+    db.add_all([NoteTag(note_id=note.id, tag_id=tag_ids[value]) for value in values])
+
+
+# -------- search --------
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError('invalid cursor') from e
+    if not isinstance(values, list):
+        raise ValueError('invalid cursor')
+    return values
+
+
+def fts5_query(q: str) -> str:
+    # every word as a quoted phrase: user input can't inject FTS5 operators
+    return ' '.join('"%s"' % word.replace('"', '""') for word in q.split())
+
+
+def search_notes_stmt(
+    dialect: str,
+    user_id: int,
+    q: str,
+    tags: list[str],
+    after: Optional[tuple[float, int]],
+    limit: int,
+):
+    """SELECT (Note, rank) ordered by rank desc, id desc, starting after the (rank, id) cursor.
+
+    With q the rank comes from ts_rank (Postgres, GIN index ix_notes_search) or
+    bm25 (SQLite FTS5); a tags-only search ranks everything 0 and walks the ids.
+    All tags must match; they are resolved through the (user_id, value) index.
+    """
+    if q and dialect == 'postgresql':
+        vector = func.to_tsvector(SEARCH_CONFIG, Note.title + ' ' + Note.content)  # same expression as the index
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        ranked = (
+            select(Note.id.label('note_id'), func.ts_rank(vector, query).label('rank'))  # type: ignore
+            .where(vector.op('@@')(query), Note.user_id == user_id)
+            .subquery('ranked')
+        )
+    elif q:
+        fts = literal_column('notes_fts')
+        ranked = (
+            select(notes_fts.c.rowid.label('note_id'), (-func.bm25(fts)).label('rank'))
+            .where(fts.op('MATCH')(fts5_query(q)))
+            .subquery('ranked')
+        )
+    else:
+        ranked = None
+
+    if ranked is not None:
+        rank = ranked.c.rank
+        stmt = select(Note, rank).join(ranked, ranked.c.note_id == Note.id)  # type: ignore
+    else:
+        rank = literal(0.0).label('rank')
+        stmt = select(Note, rank)
+    stmt = stmt.where(Note.user_id == user_id)
+
+    if tags:
+        tagged = (
+            select(NoteTag.note_id)
+            .join(Tag, Tag.id == NoteTag.tag_id)  # type: ignore
+            .where(Tag.user_id == user_id, Tag.value.in_(tags))  # type: ignore
+            .group_by(NoteTag.note_id)
+            .having(func.count() == len(tags))
+        )
+        stmt = stmt.where(Note.id.in_(tagged))  # type: ignore
+
+    if after:
+        after_rank, after_id = after
+        if ranked is not None:
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, Note.id < after_id)))
+        else:
+            stmt = stmt.where(Note.id < after_id)
+
+    order = [rank.desc(), Note.id.desc()] if ranked is not None else [Note.id.desc()]  # type: ignore
+    return stmt.order_by(*order).limit(limit)
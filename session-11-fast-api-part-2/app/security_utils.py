@@ -1,11 +1,22 @@
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 import jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 import os
 
-# Password hashing
-pwd_hash = PasswordHash.recommended()
+if TYPE_CHECKING:
+    from app.models import User
+
+# Password hashing; changing the cost parameters makes existing hashes get
+# upgraded on the user's next login (see verify_and_update_password)
+pwd_hash = PasswordHash((
+    Argon2Hasher(
+        time_cost=int(os.getenv('PASSWORD_HASH_TIME_COST', '3')),
+        memory_cost=int(os.getenv('PASSWORD_HASH_MEMORY_COST', '65536')),
+        parallelism=int(os.getenv('PASSWORD_HASH_PARALLELISM', '4')),
+    ),
+))
 
 # JWT settings
 SECRET_KEY = os.getenv('JWT_SECRET_KEY')  # Use env var in production
@@ -20,26 +31,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_hash.verify(plain_password, hashed_password)
 
-def create_access_token(user_id: int) -> str:
-    """Create JWT access token"""
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify password; also return a new hash if the stored one uses outdated parameters"""
+    return pwd_hash.verify_and_update(plain_password, hashed_password)
+
+def create_access_token(user: "User") -> str:
+    """Create JWT access token carrying a snapshot of the user"""
     to_encode = {
-        "user_id": str(user_id),
+        "user_id": str(user.id),
+        "email": user.email,
+        "username": user.username,
+        "ver": user.token_version,
         "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
         "iat": datetime.utcnow()
     }
-    print('to_encode', to_encode)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def decode_access_token(token: str) -> Optional[int]:
-    """Decode JWT token and return user_id"""
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify JWT token and return its claims (None if invalid or expired)"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print('payload', payload)
-        user_id: str = payload.get("user_id")
-        if user_id is None:
-            return None
-        return int(user_id)
-    except Exception as e:
-        print('error', e)
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp", "user_id"]})
+    except jwt.InvalidTokenError:
         return None
\ No newline at end of file
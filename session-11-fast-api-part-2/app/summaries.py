@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlmodel import Session, select
+
+from app.ai_client import AIClient, ai_client
+from app.database_async import engine as async_engine
+from app.models import Note, NoteSummary
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+async def get_summary(db: AsyncSession, note: Note, client: AIClient = ai_client) -> tuple[str, bool]:
+    """The note's summary and whether it came from the cache.
+
+    A stored summary is used only while its content_hash matches the note's
+    content; otherwise the model is called and the new summary stored.
+    """
+    digest = content_hash(note.content)
+    cached = await db.get(NoteSummary, note.id)
+    if cached and cached.content_hash == digest:
+        return cached.summary, True
+
+    summary = await client.summarize_content(note.content)
+    await db.merge(NoteSummary(note_id=note.id, content_hash=digest, summary=summary, model=client.model))
+    try:
+        await db.commit()
+    except IntegrityError:  # another request (or the batch) stored it first, or the note is gone
+        await db.rollback()
+    return summary, False
+
+
+def invalidate_summary(db: Session, note_id: int):
+    """Drop the note's summary (caller commits); the batch summarizer picks the note up again"""
+    db.exec(delete(NoteSummary).where(NoteSummary.note_id == note_id))  # type: ignore
+
+
+class BatchSummarizer:
+    """Background summarizer for notes whose summary is missing or older than the note.
+
+    Each run takes up to `batch_size` pending notes and summarizes them with at
+    most `concurrency` model calls in flight (the AIClient retries transient
+    failures). A note that still fails is retried on later runs, at most
+    `max_failures` times per process. A note whose content is unchanged since its
+    summary (a title or tag edit) only gets its summary re-stamped.
+    """
+
+    def __init__(
+        self,
+        client: AIClient = ai_client,
+        engine: AsyncEngine = async_engine,
+        batch_size: int = 50,
+        concurrency: int = 4,
+        interval: float = 30.0,
+        max_failures: int = 3,
+    ) -> None:
+        self.client = client
+        self.engine = engine
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.interval = interval
+        self.max_failures = max_failures
+        self.failures: dict[int, int] = {}
+        self.summarized = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> 'BatchSummarizer':
+        return cls(
+            batch_size=int(os.getenv('SUMMARIZER_BATCH_SIZE', '50')),
+            concurrency=int(os.getenv('SUMMARIZER_CONCURRENCY', '4')),
+            interval=float(os.getenv('SUMMARIZER_INTERVAL', '30')),
+            max_failures=int(os.getenv('SUMMARIZER_MAX_FAILURES', '3')),
+        )
+
+    async def _pending(self) -> list[tuple[Note, Optional[str]]]:
+        """(note, hash of the content its summary was made from, if any)"""
+        statement = (
+            select(Note, NoteSummary.content_hash)
+            .outerjoin(NoteSummary, NoteSummary.note_id == Note.id)  # type: ignore
+            .where(or_(NoteSummary.note_id.is_(None), NoteSummary.created_at < Note.updated_at))  # type: ignore
+            .order_by(Note.id)
+            .limit(self.batch_size)
+        )
+        given_up = [note_id for note_id, count in self.failures.items() if count >= self.max_failures]
+        if given_up:
+            statement = statement.where(Note.id.notin_(given_up))  # type: ignore
+        # short-lived session: no connection is held while the model calls run
+        async with AsyncSession(self.engine, expire_on_commit=False) as db:
+            return [(note, digest) for note, digest in (await db.execute(statement)).all()]
+
+    async def _summarize(self, note: Note, read_at: datetime, semaphore: asyncio.Semaphore) -> Optional[NoteSummary]:
+        async with semaphore:
+            try:
+                summary = await self.client.summarize_content(note.content)
+            except HTTPException as exc:
+                self.failures[note.id] = self.failures.get(note.id, 0) + 1  # type: ignore
+                self.failed += 1
+                print(f"[summarizer] note {note.id} failed: {exc.detail}")
+                return None
+        self.failures.pop(note.id, None)  # type: ignore
+        # stamped with the read time: a note edited meanwhile stays pending
+        return NoteSummary(
+            note_id=note.id,
+            content_hash=content_hash(note.content),
+            summary=summary,
+            model=self.client.model,
+            created_at=read_at,
+        )
+
+    async def run_once(self) -> int:
+        read_at = datetime.now()
+        notes, unchanged = [], []
+        for note, digest in await self._pending():
+            if digest == content_hash(note.content):
+                unchanged.append(note.id)
+            else:
+                notes.append(note)
+        if unchanged:
+            async with AsyncSession(self.engine) as db:
+                await db.execute(
+                    update(NoteSummary)
+                    .where(NoteSummary.note_id.in_(unchanged))  # type: ignore
+                    .values(created_at=read_at)
+                )
+                await db.commit()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._summarize(note, read_at, semaphore) for note in notes))
+        summaries = [summary for summary in results if summary]
+        if not summaries:
+            return 0
+        async with AsyncSession(self.engine) as db:
+            for summary in summaries:
+                await db.merge(summary)
+            try:
+                await db.commit()
+            except IntegrityError as exc:  # a note was deleted meanwhile; the rest go next run
+                await db.rollback()
+                print(f"[summarizer] store failed: {exc!r}")
+                return 0
+        self.summarized += len(summaries)
+        return len(summaries)
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                done = await self.run_once()
+            except Exception as exc:  # keep the loop alive; next run retries
+                print(f"[summarizer] failed: {exc!r}")
+                done = 0
+            if done < self.batch_size:  # caught up (or failing): wait; otherwise keep draining
+                await asyncio.sleep(self.interval)
+
+    # ---------- lifecycle (driven by the app lifespan) ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+batch_summarizer = BatchSummarizer.from_env()
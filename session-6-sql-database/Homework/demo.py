@@ -59,6 +59,7 @@ def main():
     print(f"\n--- Testing Return & Notifications ---")
     library.return_item(bob.member_id, dvd1.id)
     print(f"Bob returned '{dvd1.title}'")
+    db.process_outbox_batch()  # normally done by notification_worker.NotificationWorker
 
     notifications = alice.get_notifications()
     print(f"Alice's notifications: {notifications}")
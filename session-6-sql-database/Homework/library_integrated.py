@@ -79,12 +79,10 @@ class Member:
         return self._db.return_item(self.member_id, item_id)
 
     def get_borrowed_count(self) -> int:
-        m = self._db.get_member_by_id(self.member_id)
-        return m.get_borrowed_count() if m else 0
+        return self._db.get_active_borrow_count(self.member_id)
 
     def get_max_borrow_limit(self) -> int:
-        m = self._db.get_member_by_id(self.member_id)
-        return m.get_borrow_limit() if m else 0
+        return self._db.get_borrow_limit(self.member_id)
 
     def update(self, message: str):
         # Observer hook – persist as notification
@@ -94,9 +92,7 @@ class Member:
         return [n.message for n in self._db.get_member_notifications(self.member_id)]
 
     def clear_notifications(self):
-        notes = self._db.get_member_notifications(self.member_id)
-        for n in notes:
-            self._db.mark_notification_read(n.id)  # "clearing" == mark as read
+        self._db.mark_all_notifications_read(self.member_id)  # "clearing" == mark as read
 
     def __str__(self):
         return f"{self.name} ({self.member_id})"
@@ -130,9 +126,13 @@ class Library:
             cls._instance._db = DatabaseManager()
         return cls._instance
 
+    def unit_of_work(self):
+        """`with library.unit_of_work():` shares one DB session/transaction across facade calls."""
+        return self._db.unit_of_work()
+
     # keep len(library) behavior
     def __len__(self) -> int:
-        return len(self._db.get_all_items())
+        return self._db.count_items()
 
     # -------- Items & Members management --------
     def add_item(self, item) -> bool:
@@ -165,20 +165,20 @@ class Library:
         return self._db.search_items(query)
 
     def display_all_items(self) -> None:
-        items = self._db.get_all_items()
-        if not items:
-            print("[No items]")
-            return
-        for it in items:
+        empty = True
+        for it in self._db.iter_items():
+            empty = False
             print(f"- {it.title} by {it.creator} (ID: {it.id}) | {it.available_copies}/{it.total_copies} available")
+        if empty:
+            print("[No items]")
 
     def display_all_members(self) -> None:
-        members = self._db.get_all_members()
-        if not members:
-            print("[No members]")
-            return
-        for m in members:
+        empty = True
+        for m in self._db.iter_members():
+            empty = False
             print(f"- {m.name} ({m.id}) | borrowed: {m.get_borrowed_count()}")
+        if empty:
+            print("[No members]")
 
     # -------- Waiting list (Observer) --------
     def join_waiting_list(self, member_id: int, item_id: int) -> bool:
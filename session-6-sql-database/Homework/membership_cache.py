@@ -0,0 +1,129 @@
+# membership_cache.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class MembershipSnapshot:
+    """The membership fields the borrow rules need, detached from any session."""
+    member_id: int
+    membership_type: str
+    borrow_limit: int
+    expiry_date: Optional[date]
+
+    def is_expired(self, today: Optional[date] = None) -> bool:
+        if self.membership_type == "regular":
+            return False
+        return self.expiry_date is not None and self.expiry_date < (today or date.today())
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["expiry_date"] = self.expiry_date.isoformat() if self.expiry_date else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "MembershipSnapshot":
+        data = json.loads(raw)
+        if data["expiry_date"]:
+            data["expiry_date"] = date.fromisoformat(data["expiry_date"])
+        return cls(**data)
+
+
+class MembershipCache:
+    """Process-local TTL + LRU cache of membership snapshots keyed by member_id.
+
+    An optional Redis client acts as a shared second tier: local misses fall back
+    to it, and invalidations are applied to both tiers.
+
+    Every invalidate() bumps the member's generation. A reader takes generation()
+    before it queries the database and hands it to put(), which drops the
+    snapshot if the member was invalidated meanwhile, so a stale read cannot be
+    cached over a newer change.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0,
+                 redis_client: Any = None, redis_ttl: Optional[int] = None,
+                 prefix: str = "library:membership:"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis = redis_client
+        self.redis_ttl = redis_ttl or int(ttl)
+        self.prefix = prefix
+        self._data: "OrderedDict[int, Tuple[float, MembershipSnapshot]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+    @classmethod
+    def with_redis(cls, url: str = "redis://localhost:6379/0", **kwargs) -> "MembershipCache":
+        import redis  # optional dependency, only needed for the shared tier
+        return cls(redis_client=redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def get(self, member_id: int) -> Optional[MembershipSnapshot]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(member_id)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(member_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[member_id]
+
+        if self.redis is not None:
+            raw = self.redis.get(self.prefix + str(member_id))
+            if raw:
+                snapshot = MembershipSnapshot.from_json(raw)
+                self._store(snapshot)
+                with self._lock:
+                    self.redis_hits += 1
+                return snapshot
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def generation(self, member_id: int) -> int:
+        with self._lock:
+            return self._generations.get(member_id, 0)
+
+    def put(self, snapshot: MembershipSnapshot, generation: Optional[int] = None) -> None:
+        if not self._store(snapshot, generation):
+            return  # invalidated since the snapshot was read
+        if self.redis is not None:
+            self.redis.set(self.prefix + str(snapshot.member_id), snapshot.to_json(), ex=self.redis_ttl)
+
+    def _store(self, snapshot: MembershipSnapshot, generation: Optional[int] = None) -> bool:
+        with self._lock:
+            if generation is not None and self._generations.get(snapshot.member_id, 0) != generation:
+                return False
+            self._data[snapshot.member_id] = (time.monotonic() + self.ttl, snapshot)
+            self._data.move_to_end(snapshot.member_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def invalidate(self, member_id: int) -> None:
+        with self._lock:
+            self._data.pop(member_id, None)
+            self._generations[member_id] = self._generations.get(member_id, 0) + 1
+        if self.redis is not None:
+            self.redis.delete(self.prefix + str(member_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                    "redis_hits": self.redis_hits}
@@ -6,7 +6,7 @@ from typing import List, Optional
 
 from sqlalchemy import (
     CheckConstraint, Column, Integer, String, Boolean, Text, Date, TIMESTAMP,
-    ForeignKey, UniqueConstraint, func
+    ForeignKey, Index, UniqueConstraint, func, text
 )
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 
@@ -88,8 +88,14 @@ class MemberModel(Base):
     membership_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("memberships.id", ondelete="SET NULL"), nullable=True, unique=True
     )
+    # denormalized count of status='borrowed' rows, maintained by borrow/return
+    active_borrow_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
 
+    __table_args__ = (
+        CheckConstraint("active_borrow_count >= 0", name="ck_active_borrow_count_nonneg"),
+    )
+
     membership: Mapped[Optional["MembershipModel"]] = relationship(
         back_populates="member", uselist=False, foreign_keys=[membership_id]
     )
@@ -104,7 +110,7 @@ class MemberModel(Base):
     )
 
     def get_borrowed_count(self) -> int:
-        return sum(1 for b in self.borrows if b.status == "borrowed")
+        return self.active_borrow_count
 
     def get_borrow_limit(self) -> int:
         return self.membership.borrow_limit if self.membership else 0
@@ -133,6 +139,10 @@ class MembershipModel(Base):
             "(membership_type = 'premium' AND expiry_date IS NOT NULL)",
             name="ck_premium_expiry_enforced"
         ),
+        # expiry sweeps only ever look at premium memberships
+        Index("ix_memberships_premium_expiry", "expiry_date",
+              postgresql_where=text("membership_type = 'premium'"),
+              sqlite_where=text("membership_type = 'premium'")),
     )
 
     def is_expired(self) -> bool:
@@ -168,7 +178,17 @@ class BorrowedItemModel(Base):
     member: Mapped[MemberModel] = relationship(back_populates="borrows")
     item: Mapped[LibraryItemModel] = relationship(back_populates="borrows")
 
-    __table_args__ = (CheckConstraint("status in ('borrowed','returned')", name="ck_borrow_status"),)
+    __table_args__ = (
+        CheckConstraint("status in ('borrowed','returned')", name="ck_borrow_status"),
+        # overdue sweeps scan active borrows by date; returned rows are never indexed
+        Index("ix_borrowed_items_active_borrow_date", "borrow_date",
+              postgresql_where=text("status = 'borrowed'"),
+              sqlite_where=text("status = 'borrowed'")),
+        # open-borrow lookups for a (member, item) pair: return_item, bulk borrow/return
+        Index("ix_borrowed_items_active_member_item", "member_id", "item_id",
+              postgresql_where=text("status = 'borrowed'"),
+              sqlite_where=text("status = 'borrowed'")),
+    )
 
 
 class WaitingListModel(Base):
@@ -195,3 +215,26 @@ class NotificationModel(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
 
     member: Mapped[MemberModel] = relationship(back_populates="notifications")
+
+    __table_args__ = (
+        Index("ix_notifications_member_unread", "member_id",
+              postgresql_where=text("is_read = false"),
+              sqlite_where=text("is_read = 0")),
+    )
+
+
+class OutboxEventModel(Base):
+    """Events written in the same transaction as the change that caused them and
+    delivered later by notification_worker.NotificationWorker."""
+    __tablename__ = "outbox_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column(String(30), nullable=False)  # 'item_available'
+    item_id: Mapped[int] = mapped_column(ForeignKey("library_items.id", ondelete="CASCADE"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
+    processed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_pending", "id", postgresql_where=processed_at.is_(None),
+              sqlite_where=processed_at.is_(None)),
+    )
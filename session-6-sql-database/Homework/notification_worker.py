@@ -0,0 +1,122 @@
+# notification_worker.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, List, Optional, Protocol
+
+from database_manager import DatabaseManager, OutboxBatch
+
+
+class Outbox(Protocol):
+    def process_batch(self, limit: int) -> OutboxBatch: ...
+
+
+class DatabaseOutbox:
+    """The outbox_events table, drained through DatabaseManager."""
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self._db = db or DatabaseManager()
+
+    def process_batch(self, limit: int) -> OutboxBatch:
+        return self._db.process_outbox_batch(limit)
+
+
+class InMemoryOutbox:
+    """In-process stand-in for the outbox table, for tests and demos.
+
+    `deliver` receives the de-duplicated item ids of a batch and returns how many
+    notifications it created.
+    """
+
+    def __init__(self, deliver: Callable[[List[int]], int]):
+        self._deliver = deliver
+        self._events: Deque[tuple] = deque()
+        self._lock = threading.Lock()  # workers claim batches from their own threads
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def publish(self, item_ids: Iterable[int]) -> None:
+        now = time.monotonic()
+        self._events.extend((item_id, now) for item_id in item_ids)
+
+    def process_batch(self, limit: int) -> OutboxBatch:
+        with self._lock:
+            batch = [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+        if not batch:
+            return OutboxBatch(0, 0)
+        item_ids = list(dict.fromkeys(item_id for item_id, _ in batch))
+        sent = self._deliver(item_ids)
+        return OutboxBatch(len(batch), sent, time.monotonic() - min(ts for _, ts in batch))
+
+
+class NotificationWorker:
+    """Pool of asyncio workers that drain an outbox in batches.
+
+    Each batch runs in a worker thread (the DB layer is synchronous). Idle workers
+    back off for `idle_sleep` seconds before polling again.
+    """
+
+    def __init__(self, outbox: Optional[Outbox] = None, workers: int = 4,
+                 batch_size: int = 500, idle_sleep: float = 0.5):
+        self.outbox = outbox if outbox is not None else DatabaseOutbox()  # an empty outbox is falsy
+        self.workers = workers
+        self.batch_size = batch_size
+        self.idle_sleep = idle_sleep
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self.events = 0
+        self.notifications = 0
+        self.batches = 0
+        self.last_lag_seconds = 0.0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> None:
+        """Process batches until the outbox is empty (useful for scripts and tests)."""
+        while (await self._step()).events:
+            pass
+
+    async def _step(self) -> OutboxBatch:
+        batch = await asyncio.to_thread(self.outbox.process_batch, self.batch_size)
+        if batch.events:
+            self.events += batch.events
+            self.notifications += batch.notifications
+            self.batches += 1
+            self.last_lag_seconds = batch.lag_seconds
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                batch = await self._step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # keep the worker alive; the batch is retried next poll
+                print(f"[notification worker] batch failed: {exc!r}")
+                batch = OutboxBatch(0, 0)
+            if not batch.events:
+                await asyncio.sleep(self.idle_sleep)
+
+    def metrics(self) -> dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "events": self.events,
+            "notifications": self.notifications,
+            "batches": self.batches,
+            "events_per_sec": self.events / elapsed if elapsed else 0.0,
+            "lag_seconds": self.last_lag_seconds,
+        }
@@ -0,0 +1,102 @@
+# outbox_check.py
+"""Runs NotificationWorker over InMemoryOutbox and checks batching, dedup and lag.
+
+No database needed:
+
+    python outbox_check.py
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import List
+
+from notification_worker import InMemoryOutbox, NotificationWorker
+
+ITEMS = 200
+EVENTS = 20_000
+BATCH_SIZE = 500
+MAX_LAG_SECONDS = 0.5  # oldest event of a batch, with producers running flat out
+MIN_EVENTS_PER_SEC = 5_000
+
+
+class Recorder:
+    """The `deliver` callback: remembers every batch of item ids it was handed."""
+
+    def __init__(self, cost: float = 0.0):
+        self.cost = cost  # seconds per batch, standing in for the handoff transaction
+        self.batches: List[List[int]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, item_ids: List[int]) -> int:
+        if self.cost:
+            time.sleep(self.cost)
+        with self._lock:
+            self.batches.append(item_ids)
+        return len(item_ids)
+
+
+def expect(failures: List[str], ok: bool, message: str) -> None:
+    print(f"{'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+async def check_dedup(failures: List[str]) -> None:
+    recorder = Recorder()
+    outbox = InMemoryOutbox(recorder)
+    outbox.publish(random.randrange(ITEMS) for _ in range(EVENTS))
+    worker = NotificationWorker(outbox, workers=1, batch_size=BATCH_SIZE)
+    await worker.drain()
+
+    expect(failures, worker.events == EVENTS and len(outbox) == 0,
+           f"drain consumed all {worker.events} events")
+    expect(failures, worker.batches == EVENTS // BATCH_SIZE,
+           f"{worker.batches} batches of {BATCH_SIZE}")
+    expect(failures, all(len(ids) == len(set(ids)) for ids in recorder.batches),
+           "no item handed off twice within a batch")
+    expect(failures, worker.notifications < worker.events,
+           f"{worker.events} events collapsed into {worker.notifications} handoffs")
+
+
+async def check_throughput(failures: List[str]) -> None:
+    recorder = Recorder(cost=0.002)
+    outbox = InMemoryOutbox(recorder)
+    worker = NotificationWorker(outbox, workers=4, batch_size=BATCH_SIZE, idle_sleep=0.01)
+    await worker.start()
+    worst_lag = 0.0
+    try:
+        # producers publish in bursts while the workers drain
+        for _ in range(EVENTS // 1_000):
+            outbox.publish(random.randrange(ITEMS) for _ in range(1_000))
+            await asyncio.sleep(0.005)
+            worst_lag = max(worst_lag, worker.last_lag_seconds)
+        deadline = time.monotonic() + 10
+        while worker.events < EVENTS and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+            worst_lag = max(worst_lag, worker.last_lag_seconds)
+    finally:
+        await worker.stop()
+
+    metrics = worker.metrics()
+    expect(failures, metrics["events"] == EVENTS, f"4 workers consumed {metrics['events']} events")
+    expect(failures, metrics["events_per_sec"] >= MIN_EVENTS_PER_SEC,
+           f"{metrics['events_per_sec']:.0f} events/s (min {MIN_EVENTS_PER_SEC})")
+    expect(failures, worst_lag <= MAX_LAG_SECONDS,
+           f"worst batch lag {worst_lag * 1000:.1f}ms (max {MAX_LAG_SECONDS * 1000:.0f}ms)")
+    expect(failures, sum(len(ids) for ids in recorder.batches) == metrics["notifications"],
+           "notification count matches what was delivered")
+
+
+async def check() -> List[str]:
+    failures: List[str] = []
+    await check_dedup(failures)
+    await check_throughput(failures)
+    return failures
+
+
+if __name__ == "__main__":
+    failed = asyncio.run(check())
+    if failed:
+        raise SystemExit(f"{len(failed)} outbox checks failed")
+    print("outbox worker ok")
@@ -27,6 +27,7 @@ CREATE TABLE IF NOT EXISTS members(
     email VARCHAR(255) UNIQUE NOT NULL,
     membership_type VARCHAR(20) NOT NULL CHECK (membership_type IN ('regular', 'premium')),
     borrow_limit INTEGER NOT NULL CHECK (borrow_limit > 0),
+    active_borrow_count INTEGER NOT NULL DEFAULT 0 CHECK (active_borrow_count >= 0),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -65,3 +66,31 @@ CREATE TABLE IF NOT EXISTS notifications (
   is_read    BOOLEAN NOT NULL DEFAULT FALSE,
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
+
+-- databases created before members.active_borrow_count: add it, and (re)compute it
+-- from the active borrows so returns cannot drive it below zero
+ALTER TABLE members ADD COLUMN IF NOT EXISTS active_borrow_count INTEGER NOT NULL DEFAULT 0 CHECK (active_borrow_count >= 0);
+UPDATE members m SET active_borrow_count = (
+  SELECT COUNT(*) FROM borrowed_items b WHERE b.member_id = m.id AND b.status = 'borrowed'
+);
+
+-- partial indexes for the overdue / expiry sweeps (sweeps.py) and open-borrow lookups
+CREATE INDEX IF NOT EXISTS ix_borrowed_items_active_borrow_date ON borrowed_items (borrow_date) WHERE status = 'borrowed';
+CREATE INDEX IF NOT EXISTS ix_borrowed_items_active_member_item ON borrowed_items (member_id, item_id) WHERE status = 'borrowed';
+CREATE INDEX IF NOT EXISTS ix_memberships_premium_expiry ON memberships (expiry_date) WHERE membership_type = 'premium';
+CREATE INDEX IF NOT EXISTS ix_notifications_member_unread ON notifications (member_id) WHERE is_read = false;
+
+CREATE TABLE IF NOT EXISTS outbox_events (
+  id           SERIAL PRIMARY KEY,
+  event_type   VARCHAR(30) NOT NULL,
+  item_id      INTEGER NOT NULL REFERENCES library_items(id) ON DELETE CASCADE,
+  created_at   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  processed_at TIMESTAMP NULL
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_events_pending ON outbox_events (id) WHERE processed_at IS NULL;
+
+-- catalog search (pg_trgm for substring/similarity, tsvector for word prefixes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_library_items_title_trgm ON library_items USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_library_items_creator_trgm ON library_items USING gin (creator gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_library_items_fts ON library_items USING gin (to_tsvector('simple', title || ' ' || creator));
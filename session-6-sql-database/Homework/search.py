@@ -0,0 +1,165 @@
+# search.py
+from __future__ import annotations
+
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Engine, and_, func, literal, or_, select, text
+from sqlalchemy.sql import Select
+
+from models import LibraryItemModel
+
+# (score, item_id) of the last hit on a page; pass it back to get the next page
+SearchCursor = Tuple[float, int]
+
+
+@dataclass
+class SearchHit:
+    item_id: int
+    score: float
+
+
+# -----------------------------
+# PostgreSQL: pg_trgm + full-text
+# -----------------------------
+SEARCH_INDEX_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_library_items_title_trgm "
+    "ON library_items USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_library_items_creator_trgm "
+    "ON library_items USING gin (creator gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_library_items_fts "
+    "ON library_items USING gin (to_tsvector('simple', title || ' ' || creator))",
+)
+
+
+def ensure_search_indexes(engine: Engine) -> None:
+    """Create the trigram/full-text indexes that back search on PostgreSQL."""
+    with engine.begin() as conn:
+        for ddl in SEARCH_INDEX_DDL:
+            conn.execute(text(ddl))
+
+
+def _prefix_tsquery(query: str) -> str:
+    # 'clean co' -> 'clean:* & co:*'
+    words = re.findall(r"\w+", query.lower())
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def pg_search_stmt(query: str, limit: Optional[int] = None, after: Optional[SearchCursor] = None) -> Select:
+    """Ranked search: substring matches (served by the trigram indexes) plus word-prefix
+    matches (served by the tsvector index), best first."""
+    pattern = f"%{query}%"
+    document = func.to_tsvector("simple", LibraryItemModel.title + " " + LibraryItemModel.creator)
+    conditions = [LibraryItemModel.title.ilike(pattern), LibraryItemModel.creator.ilike(pattern)]
+    rank = func.greatest(
+        func.similarity(LibraryItemModel.title, query),
+        func.similarity(LibraryItemModel.creator, query),
+    )
+    tsquery = _prefix_tsquery(query)
+    if tsquery:
+        ts = func.to_tsquery("simple", tsquery)
+        conditions.append(document.op("@@")(ts))
+        rank = rank + func.ts_rank(document, ts)
+    else:
+        rank = rank + literal(0.0)
+    rank = rank.label("rank")
+
+    stmt = select(LibraryItemModel, rank).where(or_(*conditions))
+    if after is not None:
+        score, item_id = after
+        stmt = stmt.where(or_(rank < score, and_(rank == score, LibraryItemModel.id > item_id)))
+    stmt = stmt.order_by(rank.desc(), LibraryItemModel.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+# -----------------------------
+# In-process fallback (SQLite / tests)
+# -----------------------------
+class NGramIndex:
+    """Trigram inverted index over title/creator.
+
+    Every query is a case-insensitive substring match, like ILIKE '%q%' on
+    PostgreSQL. For 3+ characters candidates come from the rarest trigram posting
+    list and are verified against the stored text, so postings can stay compact
+    arrays; shorter queries have no trigram to look up and scan every document.
+    """
+
+    N = 3
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, array] = {}
+        self._docs: Dict[int, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @classmethod
+    def _grams(cls, value: str) -> Set[str]:
+        return {value[i:i + cls.N] for i in range(len(value) - cls.N + 1)}
+
+    def add(self, item_id: int, title: str, creator: str) -> None:
+        if item_id in self._docs:
+            self.discard(item_id)
+        title, creator = title.lower(), creator.lower()
+        self._docs[item_id] = (title, creator)
+        for gram in self._grams(title) | self._grams(creator):
+            self._postings.setdefault(gram, array("q")).append(item_id)
+
+    def discard(self, item_id: int) -> None:
+        # postings are append-only; stale ids are skipped because _docs no longer has them
+        self._docs.pop(item_id, None)
+
+    def add_many(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        for item_id, title, creator in rows:
+            self.add(item_id, title, creator)
+
+    @staticmethod
+    def _score(q: str, value: str) -> float:
+        pos = value.find(q)
+        if pos < 0:
+            return 0.0
+        if value == q:
+            base = 1.0
+        elif pos == 0:
+            base = 0.8
+        else:
+            word_pos = (" " + value).find(" " + q)
+            base = 0.6 if word_pos >= 0 else 0.4
+        return base + 0.2 * len(q) / len(value)  # favour tighter matches
+
+    def search(self, query: str, limit: Optional[int] = None,
+               after: Optional[SearchCursor] = None) -> List[SearchHit]:
+        q = " ".join(query.lower().split())
+        if not q:
+            return []
+        if len(q) < self.N:
+            candidates: Iterable[int] = list(self._docs)
+        else:
+            postings = [self._postings.get(q[i:i + self.N]) for i in range(len(q) - self.N + 1)]
+            if any(p is None for p in postings):
+                return []
+            candidates = min(postings, key=len)
+
+        hits: List[SearchHit] = []
+        seen: Set[int] = set()
+        for item_id in candidates:
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            doc = self._docs.get(item_id)
+            if doc is None:
+                continue
+            score = max(self._score(q, doc[0]), 0.6 * self._score(q, doc[1]))
+            if score > 0:
+                hits.append(SearchHit(item_id, round(score, 6)))
+
+        hits.sort(key=lambda h: (-h.score, h.item_id))
+        if after is not None:
+            a_score, a_id = after
+            hits = [h for h in hits if (-h.score, h.item_id) > (-a_score, a_id)]
+        return hits[:limit] if limit is not None else hits
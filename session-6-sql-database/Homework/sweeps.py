@@ -0,0 +1,119 @@
+# sweeps.py
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import String, and_, cast, exists, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+
+from database_manager import DatabaseManager
+from models import (
+    BorrowedItemModel, LibraryItemModel, MemberModel, MembershipModel, NotificationModel
+)
+
+
+@dataclass
+class SweepReport:
+    overdue: int = 0
+    expiring: int = 0
+    expired_with_borrows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def notifications(self) -> int:
+        return self.overdue + self.expiring + self.expired_with_borrows
+
+
+class SweepEngine:
+    """Set-based overdue / membership-expiry sweeps.
+
+    Each sweep is one INSERT ... SELECT into notifications, backed by the partial
+    indexes on borrowed_items (active borrows) and memberships (premium expiry).
+    A member who still has the same unread notification is not notified again, so
+    the sweep can run as often as needed.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None, loan_days: int = 14, expiry_warning_days: int = 7):
+        self._db = db or DatabaseManager()
+        self.loan_days = loan_days
+        self.expiry_warning_days = expiry_warning_days
+
+    # ---------- queries ----------
+    def overdue_stmt(self, now: Optional[datetime] = None) -> Select:
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.loan_days)
+        message = literal("'") + LibraryItemModel.title + literal("' is overdue, please return it.")
+        return (
+            select(BorrowedItemModel.member_id, message.label("message"))
+            .join(LibraryItemModel, LibraryItemModel.id == BorrowedItemModel.item_id)
+            .where(BorrowedItemModel.status == "borrowed", BorrowedItemModel.borrow_date < cutoff)
+            .where(self._not_already_notified(BorrowedItemModel.member_id, message))
+        )
+
+    def expiring_stmt(self, today: Optional[date] = None) -> Select:
+        today = today or date.today()
+        message = literal("Your premium membership expires on ") + cast(MembershipModel.expiry_date, String) + "."
+        return (
+            select(MembershipModel.member_id, message.label("message"))
+            .where(
+                MembershipModel.membership_type == "premium",
+                MembershipModel.expiry_date >= today,
+                MembershipModel.expiry_date <= today + timedelta(days=self.expiry_warning_days),
+            )
+            .where(self._not_already_notified(MembershipModel.member_id, message))
+        )
+
+    def expired_with_borrows_stmt(self, today: Optional[date] = None) -> Select:
+        today = today or date.today()
+        message = literal("Your premium membership has expired; please renew or return your borrowed items.")
+        return (
+            select(MembershipModel.member_id, message.label("message"))
+            .join(MemberModel, MemberModel.id == MembershipModel.member_id)
+            .where(
+                MembershipModel.membership_type == "premium",
+                MembershipModel.expiry_date < today,
+                MemberModel.active_borrow_count > 0,
+            )
+            .where(self._not_already_notified(MembershipModel.member_id, message))
+        )
+
+    @staticmethod
+    def _not_already_notified(member_id: ColumnElement, message: ColumnElement) -> ColumnElement:
+        return ~exists().where(and_(
+            NotificationModel.member_id == member_id,
+            NotificationModel.is_read == False,  # noqa
+            NotificationModel.message == message,
+        ))
+
+    # ---------- running ----------
+    @staticmethod
+    def _notify(s: Session, stmt: Select) -> int:
+        res = s.execute(insert(NotificationModel).from_select(["member_id", "message"], stmt))
+        return res.rowcount
+
+    def run_once(self) -> SweepReport:
+        """Run all three sweeps in one transaction and report how many notifications each created."""
+        start = time.perf_counter()
+        report = SweepReport()
+        with self._db.session_scope() as s:
+            report.overdue = self._notify(s, self.overdue_stmt())
+            report.expiring = self._notify(s, self.expiring_stmt())
+            report.expired_with_borrows = self._notify(s, self.expired_with_borrows_stmt())
+        report.seconds = time.perf_counter() - start
+        return report
+
+    async def run_forever(self, interval: float = 3600.0) -> None:
+        """Scheduler loop: run the sweep every `interval` seconds until cancelled."""
+        while True:
+            try:
+                report = await asyncio.to_thread(self.run_once)
+                print(f"[sweep] {report.notifications} notifications in {report.seconds:.2f}s "
+                      f"(overdue={report.overdue}, expiring={report.expiring}, "
+                      f"expired={report.expired_with_borrows})")
+            except Exception as exc:  # keep the schedule alive; next run retries
+                print(f"[sweep] failed: {exc!r}")
+            await asyncio.sleep(interval)